@@ -0,0 +1,182 @@
+import asyncio
+import functools
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+ANALYSIS_SAMPLE_RATE = 11025
+FFT_SIZE = 2048
+HOP_SIZE = 1024
+BAND_COUNT = 24
+MIN_FREQUENCY = 55.0  # A1; lower bins carry little pitch information
+
+
+class AudioJobPool:
+    """Bounded executor for CPU-heavy audio jobs, sized to the machine's cores.
+
+    ffmpeg runs in its own process and NumPy releases the GIL in its FFT and
+    reduction kernels, so threads are enough to keep this work off the event
+    loop without the pickling cost of a process pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='audio-job')
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def decode_pcm(audio: bytes, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> np.ndarray:
+    """Decodes compressed audio to mono float32 PCM in [-1, 1] through an ffmpeg pipe."""
+    result = subprocess.run(
+        [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-i', 'pipe:0',
+            '-f', 's16le', '-ac', '1', '-ar', str(sample_rate),
+            'pipe:1'
+        ],
+        input=audio,
+        capture_output=True,
+        check=False
+    )
+    if result.returncode != 0 and not result.stdout:
+        raise ValueError(f"ffmpeg could not decode audio: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def spectrogram(pcm: np.ndarray) -> np.ndarray:
+    """Magnitude STFT as a (frames, bins) array, computed in one vectorized pass."""
+    if len(pcm) < FFT_SIZE:
+        return np.empty((0, FFT_SIZE // 2 + 1), dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(pcm, FFT_SIZE)[::HOP_SIZE]
+    return np.abs(np.fft.rfft(frames * np.hanning(FFT_SIZE), axis=1)).astype(np.float32)
+
+
+def _chroma_matrix(sample_rate: int) -> np.ndarray:
+    freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate)
+    matrix = np.zeros((len(freqs), 12), dtype=np.float32)
+    valid = freqs >= MIN_FREQUENCY
+    pitch_class = np.round(12 * np.log2(freqs[valid] / 440.0)).astype(int) % 12
+    matrix[np.nonzero(valid)[0], pitch_class] = 1.0
+    return matrix
+
+
+def _band_matrix(sample_rate: int) -> np.ndarray:
+    freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate)
+    edges = np.geomspace(MIN_FREQUENCY, sample_rate / 2, BAND_COUNT + 1)
+    band = np.clip(np.searchsorted(edges, freqs, side='right') - 1, -1, BAND_COUNT - 1)
+    matrix = np.zeros((len(freqs), BAND_COUNT), dtype=np.float32)
+    valid = band >= 0
+    matrix[np.nonzero(valid)[0], band[valid]] = 1.0
+    return matrix
+
+
+_CHROMA = _chroma_matrix(ANALYSIS_SAMPLE_RATE)
+_BANDS = _band_matrix(ANALYSIS_SAMPLE_RATE)
+
+
+@dataclass
+class Fingerprint:
+    chroma: np.ndarray  # mean pitch-class profile, unit length
+    bands: np.ndarray   # mean log band energies, mean-removed and unit length
+
+    def similarity(self, other: 'Fingerprint') -> float:
+        """Cosine similarity of both profiles; the weaker of the two decides."""
+        return float(min(np.dot(self.chroma, other.chroma), np.dot(self.bands, other.bands)))
+
+
+def _unit(vector: np.ndarray) -> Optional[np.ndarray]:
+    norm = np.linalg.norm(vector)
+    if not np.isfinite(norm) or norm <= 1e-9:
+        return None
+    return vector / norm
+
+
+def fingerprint(pcm: np.ndarray) -> Optional[Fingerprint]:
+    """Summarizes a snippet by its key/harmony profile and spectral envelope.
+
+    Returns None for snippets too short or too quiet to describe.
+    """
+    power = spectrogram(pcm) ** 2
+    if not len(power):
+        return None
+
+    chroma = power @ _CHROMA
+    chroma /= np.maximum(chroma.sum(axis=1, keepdims=True), 1e-9)
+    bands = np.log1p(power @ _BANDS).mean(axis=0)
+
+    chroma_vector = _unit(chroma.mean(axis=0))
+    band_vector = _unit(bands - bands.mean())
+    if chroma_vector is None or band_vector is None:
+        return None
+    return Fingerprint(chroma_vector, band_vector)
+
+
+MUSIC = 'music'
+SPEECH = 'speech'
+SILENCE = 'silence'
+UNKNOWN = 'unknown'
+
+CLASSIFIER_FRAME_SIZE = 512
+SILENCE_RMS_DB = -50.0
+SPEECH_LOW_ENERGY_RATIO = 0.4
+SPEECH_ZCR_STD = 0.06
+SPEECH_FLATNESS = 0.1
+
+
+@dataclass
+class SnippetFeatures:
+    rms_db: float
+    low_energy_ratio: float  # share of frames well below the average energy (speech pauses)
+    zcr_std: float           # voiced/unvoiced alternation shows up as zero-crossing variance
+    flatness: float          # tonal music is peaky, fricatives and noise are flat
+
+
+def extract_features(pcm: np.ndarray) -> Optional[SnippetFeatures]:
+    if len(pcm) < max(FFT_SIZE, CLASSIFIER_FRAME_SIZE):
+        return None
+
+    frames = np.lib.stride_tricks.sliding_window_view(pcm, CLASSIFIER_FRAME_SIZE)[::CLASSIFIER_FRAME_SIZE]
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    overall_rms = float(np.sqrt(np.mean(pcm ** 2)))
+    rms_db = float(20 * np.log10(max(overall_rms, 1e-10)))
+
+    low_energy_ratio = float(np.mean(rms < 0.5 * rms.mean())) if rms.mean() > 0 else 1.0
+    zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+
+    power = spectrogram(pcm) ** 2 + 1e-12
+    frame_flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    frame_energy = power.sum(axis=1)
+    voiced = frame_energy > 0.1 * frame_energy.mean()
+    flatness = float(np.mean(frame_flatness[voiced])) if voiced.any() else 1.0
+
+    return SnippetFeatures(rms_db, low_energy_ratio, float(np.std(zcr)), flatness)
+
+
+def classify(pcm: np.ndarray) -> str:
+    """Labels a snippet as music, speech or silence, or unknown if it is too short to tell.
+
+    Speech needs at least two of the three speech indicators to agree, so
+    borderline snippets are treated as music and still get recognized.
+    """
+    features = extract_features(pcm)
+    if features is None:
+        return UNKNOWN
+    if features.rms_db < SILENCE_RMS_DB:
+        return SILENCE
+
+    speech_votes = sum((
+        features.low_energy_ratio > SPEECH_LOW_ENERGY_RATIO,
+        features.zcr_std > SPEECH_ZCR_STD,
+        features.flatness > SPEECH_FLATNESS,
+    ))
+    return SPEECH if speech_votes >= 2 else MUSIC
@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+# Bitrates in kbps indexed by [version_group][layer][bitrate_index]; version_group 0 = MPEG-1, 1 = MPEG-2/2.5
+_MP3_BITRATES = {
+    (0, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (0, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (0, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (1, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (1, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (1, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Sample rates indexed by the 2-bit MPEG version field (0 = 2.5, 2 = MPEG-2, 3 = MPEG-1)
+_MP3_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+_ADTS_SAMPLE_RATES = (
+    96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350
+)
+
+MP3 = 'mp3'
+AAC = 'aac'
+
+
+@dataclass
+class Frame:
+    offset: int
+    length: int
+    samples: int
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate
+
+
+def parse_mp3_header(data: bytes, offset: int) -> Optional[Frame]:
+    """Parses an MPEG audio (layer I-III) frame header at `offset`."""
+    if offset + 4 > len(data):
+        return None
+    b1, b2 = data[offset + 1], data[offset + 2]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    version_group = 0 if version == 3 else 1
+    bitrate = _MP3_BITRATES[(version_group, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 2 or version_group == 0:
+        length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+    else:
+        length = 72 * bitrate // sample_rate + padding
+        samples = 576
+    return Frame(offset, length, samples, sample_rate)
+
+
+def parse_adts_header(data: bytes, offset: int) -> Optional[Frame]:
+    """Parses an ADTS (AAC) frame header at `offset`."""
+    if offset + 7 > len(data):
+        return None
+    b1 = data[offset + 1]
+    if data[offset] != 0xFF or (b1 & 0xF6) != 0xF0:
+        return None
+
+    rate_index = (data[offset + 2] >> 2) & 0x0F
+    if rate_index >= len(_ADTS_SAMPLE_RATES):
+        return None
+    length = ((data[offset + 3] & 0x03) << 11) | (data[offset + 4] << 3) | (data[offset + 5] >> 5)
+    header_size = 7 if b1 & 0x01 else 9
+    if length < header_size:
+        return None
+    raw_blocks = (data[offset + 6] & 0x03) + 1
+    return Frame(offset, length, 1024 * raw_blocks, _ADTS_SAMPLE_RATES[rate_index])
+
+
+_PARSERS = {MP3: parse_mp3_header, AAC: parse_adts_header}
+
+
+def _synced_frame(data: bytes, offset: int, codec: str) -> Optional[Frame]:
+    """Returns the frame at `offset` only if the following header also parses.
+
+    Sync words occur by chance inside compressed payloads, so a single header
+    is not trusted until the next frame lines up behind it.
+    """
+    parse = _PARSERS[codec]
+    frame = parse(data, offset)
+    if frame is None:
+        return None
+    next_offset = offset + frame.length
+    if next_offset + 4 > len(data):
+        return frame if next_offset <= len(data) else None
+    return frame if parse(data, next_offset) is not None else None
+
+
+def find_sync(data: bytes, codec: str, start: int = 0) -> Optional[int]:
+    offset = data.find(b'\xff', start)
+    while offset != -1:
+        if _synced_frame(data, offset, codec):
+            return offset
+        offset = data.find(b'\xff', offset + 1)
+    return None
+
+
+def detect_codec(data: bytes) -> Optional[str]:
+    """Guesses whether a stream snippet is MP3 or ADTS-AAC from its first synced frame."""
+    candidates = {codec: find_sync(data, codec) for codec in _PARSERS}
+    found = {codec: offset for codec, offset in candidates.items() if offset is not None}
+    if not found:
+        return None
+    return min(found, key=found.get)
+
+
+def iter_frames(data: bytes, codec: str) -> Iterator[Frame]:
+    """Yields consecutive frames, resyncing after garbage such as a mid-frame slice start."""
+    offset = find_sync(data, codec)
+    parse = _PARSERS[codec]
+    while offset is not None:
+        frame = parse(data, offset)
+        if frame is None or offset + frame.length > len(data):
+            offset = find_sync(data, codec, offset + 1)
+            continue
+        yield frame
+        offset += frame.length
+
+
+def trim_leading(data: bytes, seconds: float, codec: Optional[str] = None) -> Optional[bytes]:
+    """Drops the first `seconds` of audio by cutting at a frame boundary, without decoding.
+
+    Returns None when the snippet is not a recognizable MP3 or ADTS stream, so the
+    caller can fall back to a decoder. A zero duration still realigns the data to
+    the first whole frame, which is useful for ring-buffer slices.
+    """
+    codec = codec or detect_codec(data)
+    if codec is None:
+        return None
+
+    elapsed = 0.0
+    for frame in iter_frames(data, codec):
+        if elapsed >= seconds:
+            return data[frame.offset:]
+        elapsed += frame.duration
+    return b''
@@ -0,0 +1,303 @@
+import asyncio
+from typing import Callable, Optional
+
+import aiohttp
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-size byte buffer that keeps only the most recent `capacity` bytes."""
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._write_pos = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._write_pos = 0
+        self._size = 0
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        view = memoryview(chunk)
+        if len(view) >= self.capacity:
+            # Only the tail can survive, so restart the buffer with it
+            self._data[:] = view[-self.capacity:]
+            self._write_pos = 0
+            self._size = self.capacity
+            return
+
+        first = min(len(view), self.capacity - self._write_pos)
+        self._data[self._write_pos:self._write_pos + first] = view[:first]
+        rest = len(view) - first
+        if rest:
+            self._data[:rest] = view[first:]
+        self._write_pos = (self._write_pos + len(view)) % self.capacity
+        self._size = min(self.capacity, self._size + len(view))
+
+    def read_last(self, size: int) -> bytes:
+        size = min(size, self._size)
+        if size <= 0:
+            return b''
+        start = (self._write_pos - size) % self.capacity
+        if start + size <= self.capacity:
+            return bytes(self._data[start:start + size])
+        return bytes(self._data[start:]) + bytes(self._data[:self._write_pos])
+
+
+class StreamDecoder:
+    """One long-lived ffmpeg process that turns a continuous stream into mono PCM.
+
+    Compressed chunks are piped in as they arrive and the decoded 16-bit samples
+    are kept in their own ring buffer, so analysis never has to spawn ffmpeg for
+    a snippet.
+    """
+
+    def __init__(self, sample_rate: int, buffer_seconds: int):
+        self.sample_rate = sample_rate
+        self._pcm = AudioRingBuffer(sample_rate * 2 * buffer_seconds)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._pump_task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        self._pcm.clear()
+        self._process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-probesize', '32768', '-i', 'pipe:0',
+            '-f', 's16le', '-ac', '1', '-ar', str(self.sample_rate),
+            'pipe:1',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._pump_task = asyncio.create_task(self._pump())
+
+    async def feed(self, chunk: bytes) -> None:
+        if not self.alive:
+            raise ConnectionError("decoder process exited")
+        self._process.stdin.write(chunk)
+        await self._process.stdin.drain()
+
+    def pcm_last(self, seconds: int) -> Optional[np.ndarray]:
+        """Returns the latest `seconds` of decoded audio as float32, or None if not buffered yet."""
+        needed = self.sample_rate * 2 * seconds
+        if len(self._pcm) < needed:
+            return None
+        return np.frombuffer(self._pcm.read_last(needed), dtype='<i2').astype(np.float32) / 32768.0
+
+    async def close(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+        self._process = None
+        self._pump_task = None
+
+    async def _pump(self) -> None:
+        leftover = b''
+        while True:
+            chunk = await self._process.stdout.read(64 * 1024)
+            if not chunk:
+                return
+            chunk = leftover + chunk
+            usable = len(chunk) - len(chunk) % 2  # keep samples whole
+            leftover = chunk[usable:]
+            self._pcm.write(chunk[:usable])
+
+
+class StationStreamReader:
+    """Keeps one long-lived connection to a station stream and buffers its latest audio.
+
+    The reader reconnects with exponential backoff and clears the buffer on every
+    reconnect so a snippet never splices audio from both sides of a gap. Stations
+    with a `live_intro` play an intro on connect, so those bytes are skipped once per
+    connection instead of being trimmed from every snippet.
+    """
+
+    DEFAULT_BITRATE_KBPS = 128
+    READ_CHUNK_SIZE = 16 * 1024
+    RECONNECT_BACKOFF = (1, 60)  # (initial, max) seconds
+
+    def __init__(
+        self,
+        name: str,
+        stream_url: str,
+        session_factory: Callable[[], aiohttp.ClientSession],
+        buffer_seconds: int,
+        live_intro: Optional[int] = None,
+        logger=None,
+        decode_sample_rate: Optional[int] = None
+    ):
+        self.name = name
+        self.stream_url = stream_url
+        self.buffer_seconds = buffer_seconds
+        self.live_intro = live_intro
+        self.logger = logger
+        self._session_factory = session_factory
+        self._byte_rate = self.DEFAULT_BITRATE_KBPS * 125
+        self._buffer = AudioRingBuffer(self._byte_rate * buffer_seconds)
+        self._bytes_since_connect = 0
+        self._updated = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.decode_sample_rate = decode_sample_rate
+        self._decoder: Optional[StreamDecoder] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name=f'stream-reader-{self.name}')
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._close_decoder()
+
+    def recent_pcm(self, duration: int) -> Optional[np.ndarray]:
+        """Decoded audio for the latest `duration` seconds, when continuous decoding is on."""
+        if self._decoder is None or not self._decoder.alive:
+            return None
+        return self._decoder.pcm_last(duration)
+
+    async def snapshot(self, duration: int, timeout: float) -> bytes:
+        """Returns the most recent `duration` seconds, waiting up to `timeout` for enough audio."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._bytes_needed(duration) > self._available():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise ConnectionError(
+                    f"Stream '{self.stream_url}' buffered {self._available()} bytes, "
+                    f"needed {self._bytes_needed(duration)}"
+                )
+            self._updated.clear()
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                continue
+        return self._buffer.read_last(self._bytes_needed(duration))
+
+    def _bytes_needed(self, duration: int) -> int:
+        return min(self._byte_rate * duration, self._buffer.capacity)
+
+    def _available(self) -> int:
+        return min(len(self._buffer), self._bytes_since_connect)
+
+    async def _run(self) -> None:
+        backoff, max_backoff = self.RECONNECT_BACKOFF
+        while True:
+            try:
+                await self._stream_once()
+                backoff = self.RECONNECT_BACKOFF[0]
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if self.logger:
+                    self.logger.warning(
+                        f"Stream reader disconnected, retrying in {backoff}s: {exc}",
+                        extra={'station': self.name}
+                    )
+                await self._drop_stale_audio()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+
+    async def _drop_stale_audio(self) -> None:
+        """Forgets audio from before a disconnect so snapshots wait for the next connection."""
+        self._buffer.clear()
+        self._bytes_since_connect = 0
+        await self._close_decoder()
+
+    async def _stream_once(self) -> None:
+        async with self._session_factory().get(self.stream_url) as response:
+            response.raise_for_status()
+            self._configure_bitrate(response.headers)
+            self._buffer.clear()
+            self._bytes_since_connect = 0
+            skip = (self.live_intro or 0) * self._byte_rate
+            await self._start_decoder()
+
+            while True:
+                chunk = await response.content.read(self.READ_CHUNK_SIZE)
+                if not chunk:
+                    raise ConnectionError("stream ended")
+                if skip:
+                    dropped = min(skip, len(chunk))
+                    skip -= dropped
+                    chunk = chunk[dropped:]
+                    if not chunk:
+                        continue
+                self._buffer.write(chunk)
+                self._bytes_since_connect += len(chunk)
+                self._updated.set()
+                await self._feed_decoder(chunk)
+
+    async def _start_decoder(self) -> None:
+        """Restarts the PCM decoder so a new connection never continues the old bitstream."""
+        await self._close_decoder()
+        if not self.decode_sample_rate:
+            return
+        decoder = StreamDecoder(self.decode_sample_rate, self.buffer_seconds)
+        try:
+            await decoder.start()
+        except OSError as exc:
+            if self.logger:
+                self.logger.warning(
+                    f"Continuous decoding unavailable, falling back to per-snippet decoding: {exc}",
+                    extra={'station': self.name}
+                )
+            self.decode_sample_rate = None
+            return
+        self._decoder = decoder
+
+    async def _feed_decoder(self, chunk: bytes) -> None:
+        if self._decoder is None:
+            return
+        try:
+            await self._decoder.feed(chunk)
+        except (ConnectionError, OSError) as exc:
+            if self.logger:
+                self.logger.warning(
+                    f"Stream decoder stopped, restarting on next connection: {exc}",
+                    extra={'station': self.name}
+                )
+            await self._close_decoder()
+
+    async def _close_decoder(self) -> None:
+        if self._decoder is not None:
+            await self._decoder.close()
+            self._decoder = None
+
+    def _configure_bitrate(self, headers) -> None:
+        bitrate = headers.get('icy-br', '').split(',')[0].strip()
+        try:
+            kbps = int(bitrate)
+        except ValueError:
+            kbps = self.DEFAULT_BITRATE_KBPS
+        byte_rate = (kbps if kbps > 0 else self.DEFAULT_BITRATE_KBPS) * 125
+        if byte_rate != self._byte_rate:
+            self._byte_rate = byte_rate
+            self._buffer = AudioRingBuffer(byte_rate * self.buffer_seconds)
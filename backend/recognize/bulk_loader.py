@@ -0,0 +1,121 @@
+import hashlib
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from psycopg2.extras import Json
+
+# Conflict target of every table the loader can merge into
+MERGE_KEYS = {
+    'artists': ('id',),
+    'albums': ('id',),
+    'songs': ('id',),
+    'album_artists': ('album_id', 'artist_id'),
+    'song_artists': ('song_id', 'artist_id'),
+    'plays': ('song_id', 'station_id', 'played_at'),
+}
+# Tables whose existing rows are updated on conflict; the rest keep the existing row
+UPDATED_TABLES = {'artists', 'albums', 'songs'}
+# Columns that must not be overwritten with a missing value
+MERGE_EXPRESSIONS = {
+    'image_url': 'COALESCE({table}.image_url, EXCLUDED.image_url)',
+    'release_date': 'COALESCE(EXCLUDED.release_date, {table}.release_date)',
+}
+# FK-safe order for loading several tables in one transaction
+LOAD_ORDER = ('artists', 'albums', 'album_artists', 'songs', 'song_artists', 'plays')
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+class BulkLoader:
+    """Loads large row sets with COPY and merges them with the same ON CONFLICT rules as the upserts.
+
+    Rows are streamed with `COPY ... FROM STDIN` into a session-private staging
+    table (a temporary table, so it is never WAL-logged and parallel loaders
+    cannot see each other's rows), then merged into the target table with a
+    single INSERT ... SELECT ... ON CONFLICT. Everything runs in the caller's
+    transaction; staging rows are discarded after each merge.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def load(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """Merges `rows` (values in `columns` order) into `table`, returning the rows inserted or updated."""
+        keys = MERGE_KEYS[table]
+        column_list = ', '.join(columns)
+        stage = self._staging_table(table, columns)
+
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DELETE ROWS AS "
+                f"SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+            cur.copy_expert(f"COPY {stage} ({column_list}) FROM STDIN", _CopyStream(rows))
+
+            if table in UPDATED_TABLES:
+                # One source row per key, as ON CONFLICT DO UPDATE may touch a row only once
+                key_list = ', '.join(keys)
+                select = f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {stage} ORDER BY {key_list}"
+                updates = [
+                    f"{column} = " + MERGE_EXPRESSIONS.get(column, 'EXCLUDED.{column}').format(table=table, column=column)
+                    for column in columns if column not in keys
+                ]
+                conflict = f"DO UPDATE SET {', '.join(updates + ['updated_at = CURRENT_TIMESTAMP'])}"
+            else:
+                select = f"SELECT {column_list} FROM {stage}"
+                conflict = "DO NOTHING"
+
+            cur.execute(
+                f"INSERT INTO {table} ({column_list}) {select} "
+                f"ON CONFLICT ({', '.join(keys)}) {conflict}"
+            )
+            merged = cur.rowcount
+            cur.execute(f"TRUNCATE {stage}")
+        return merged
+
+    @staticmethod
+    def _staging_table(table: str, columns: Sequence[str]) -> str:
+        # Callers load different column subsets of the same table, so each subset gets its own table
+        suffix = hashlib.blake2b(','.join(columns).encode('utf-8'), digest_size=4).hexdigest()
+        return f'stage_{table}_{suffix}'
+
+
+class _CopyStream(io.RawIOBase):
+    """File-like view of rows in COPY text format, encoded lazily as psycopg2 reads it."""
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows: Iterator[Sequence[Any]] = iter(rows)
+        self._buffer = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        while size is None or size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = '\t'.join(_copy_value(value) for value in row) + '\n'
+            self._buffer += line.encode('utf-8')
+        if size is None or size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _copy_value(value: Any) -> str:
+    if isinstance(value, Json):
+        value = value.adapted
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return value.translate(_COPY_ESCAPES)
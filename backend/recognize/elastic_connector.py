@@ -2,6 +2,7 @@ import os
 import json
 from tqdm import tqdm
 from helper import Helper
+from track_file import TrackFileReader
 
 class ElasticConnector:
     def __init__(self, station_name='glglz'):
@@ -44,12 +45,11 @@ class ElasticConnector:
     def process_file(self, file_path):
         """Saves into elasticsearch data in a simplified format"""
         self.update_plays_index(os.path.basename(file_path))
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            if data.get('archived', False):
+        with TrackFileReader(file_path) as reader:
+            if reader.archived:
                 return
             self.logger.info(f"Archiving into Elastic database {file_path}...")
-            for record in data['tracks']:
+            for record in reader.tracks():
                 song_data = record.copy()
                 song_data.pop('played_at', None)
                 self.index_song_if_needed(song_data)
@@ -59,9 +59,8 @@ class ElasticConnector:
     def cleanup_file(self, file_path):
         """Deletes a simplified data file if it holds no data"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                should_delete = not data.get('tracks')
+            with TrackFileReader(file_path) as reader:
+                should_delete = next(reader.tracks(), None) is None
         except Exception as e:
             return False
         
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+# (content digest, stored image is set, linked artist ids)
+KnownEntity = Tuple[bytes, bool, FrozenSet[str]]
+
+
+class KnownEntityCache:
+    """Fingerprints of the artists, albums and songs already stored in Postgres.
+
+    Radio repeats the same catalog all day, so most plays carry entities that are
+    already stored unchanged. A digest of the columns an upsert would overwrite is
+    kept per id, together with whether the row already has an image (images are
+    only ever filled in, never replaced) and the artist ids it is linked to (links
+    are only ever added). An entity is rewritten only when one of those would
+    actually change. The cache is warmed from the tables once per process.
+    """
+
+    WARM_FETCH_SIZE = 5000
+
+    _shared: Optional['KnownEntityCache'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._tables: Dict[str, Dict[str, KnownEntity]] = {'artists': {}, 'albums': {}, 'songs': {}}
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    @classmethod
+    def shared(cls) -> 'KnownEntityCache':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def digest(values: Sequence[Any]) -> bytes:
+        payload = json.dumps(list(values), default=str, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables.values())
+
+    def changed(
+        self,
+        table: str,
+        entity_id: str,
+        values: Sequence[Any],
+        image_url: Optional[str] = None,
+        artist_ids: Iterable[str] = ()
+    ) -> bool:
+        known = self._tables[table].get(entity_id)
+        if known is None:
+            return True
+        digest, has_image, linked = known
+        return (
+            digest != self.digest(values)
+            or (not has_image and image_url is not None)
+            or not linked.issuperset(artist_ids)
+        )
+
+    def remember(
+        self,
+        table: str,
+        entity_id: str,
+        values: Sequence[Any],
+        image_url: Optional[str] = None,
+        artist_ids: Iterable[str] = ()
+    ) -> None:
+        with self._lock:
+            known = self._tables[table].get(entity_id)
+            has_image = image_url is not None or bool(known and known[1])
+            linked = frozenset(artist_ids) | (known[2] if known else frozenset())
+            self._tables[table][entity_id] = (self.digest(values), has_image, linked)
+
+    def clear(self) -> None:
+        """Forgets everything, e.g. after rows were deleted behind the cache's back."""
+        with self._lock:
+            for table in self._tables.values():
+                table.clear()
+
+    def warm(self, conn) -> None:
+        """Loads fingerprints for every stored entity, streaming rows with a server-side cursor."""
+        queries = {
+            'artists': """SELECT id, name, image_url IS NOT NULL, '{}'::varchar[]
+                          FROM artists""",
+            'albums': """SELECT al.id, al.name, al.release_date, al.image_url IS NOT NULL,
+                                COALESCE(array_agg(aa.artist_id) FILTER (WHERE aa.artist_id IS NOT NULL), '{}')
+                         FROM albums al LEFT JOIN album_artists aa ON aa.album_id = al.id
+                         GROUP BY al.id""",
+            'songs': """SELECT s.id, s.name, s.album_id, s.duration_ms, s.popularity, s.external_links,
+                               s.image_url IS NOT NULL,
+                               COALESCE(array_agg(sa.artist_id) FILTER (WHERE sa.artist_id IS NOT NULL), '{}')
+                        FROM songs s LEFT JOIN song_artists sa ON sa.song_id = s.id
+                        GROUP BY s.id""",
+        }
+        loaded: Dict[str, Dict[str, KnownEntity]] = {}
+        for table, query in queries.items():
+            entries: Dict[str, KnownEntity] = {}
+            with conn.cursor(name=f'warm_{table}') as cur:
+                cur.itersize = self.WARM_FETCH_SIZE
+                cur.execute(query)
+                for row in cur:
+                    entity_id, values, has_image, artist_ids = row[0], row[1:-2], row[-2], row[-1]
+                    entries[entity_id] = (self.digest(values), bool(has_image), frozenset(artist_ids or ()))
+            loaded[table] = entries
+
+        with self._lock:
+            self._tables = loaded
+            self.warmed = True
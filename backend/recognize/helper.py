@@ -1,35 +1,94 @@
 import os
 import json
 import logging
+import threading
 from copy import deepcopy
 from logging.handlers import RotatingFileHandler
 
 class Helper:
+    # Parsed configs keyed by the config_filename argument: (path, file stamp, merged config)
+    _config_cache = {}
+    _config_lock = threading.Lock()
+    _config_subscribers = []
+
     def __init__(self):
         return
 
     @staticmethod
     def load_config(config_filename='./config.json'):
-        """Loads configuration data from JSON and overlays environment settings."""
+        """Loads configuration data from JSON and overlays environment settings.
+
+        The file is parsed once and re-read only when its mtime or size changes;
+        every caller still gets its own copy to mutate.
+        """
+        return deepcopy(Helper._cached_config(config_filename))
+
+    @staticmethod
+    def check_config_changes(config_filename='./config.json'):
+        """Re-reads the config if the file changed and notifies subscribers; returns True on change."""
+        before = Helper._config_cache.get(config_filename)
+        config = Helper._cached_config(config_filename)
+        return before is not None and before[2] != config
+
+    @staticmethod
+    def subscribe_config(callback):
+        """Calls `callback(config)` with a fresh copy whenever a cached config file changes.
 
-        def first_existing_path(paths):
-            for candidate in paths:
-                if candidate and os.path.exists(candidate):
-                    return candidate
-            return None
+        Returns a function that removes the subscription.
+        """
+        with Helper._config_lock:
+            Helper._config_subscribers.append(callback)
 
+        def unsubscribe():
+            with Helper._config_lock:
+                if callback in Helper._config_subscribers:
+                    Helper._config_subscribers.remove(callback)
+        return unsubscribe
+
+    @staticmethod
+    def _resolve_config_path(config_filename):
         base_dir = os.path.dirname(os.path.abspath(__file__))
         env_path = os.getenv('WORKER_CONFIG_PATH')
         search_paths = [env_path, config_filename, os.path.join(base_dir, config_filename)]
+        for candidate in search_paths:
+            if candidate and os.path.exists(candidate):
+                return candidate
+        return None
 
-        config_path = first_existing_path(search_paths)
-        config_data = {}
-        if config_path:
-            with open(config_path, 'r', encoding='utf-8') as file:
-                config_data = json.load(file)
-
-        merged_config = deepcopy(config_data) if isinstance(config_data, dict) else {}
-        Helper._apply_env_overrides(merged_config)
+    @staticmethod
+    def _cached_config(config_filename='./config.json'):
+        """Returns the shared parsed config; callers must not mutate it."""
+        config_path = Helper._resolve_config_path(config_filename)
+        try:
+            stat = os.stat(config_path) if config_path else None
+            stamp = (stat.st_mtime_ns, stat.st_size) if stat else None
+        except OSError:
+            stamp = None
+
+        with Helper._config_lock:
+            cached = Helper._config_cache.get(config_filename)
+            if cached and cached[0] == config_path and cached[1] == stamp:
+                return cached[2]
+
+            config_data = {}
+            if config_path and stamp:
+                try:
+                    with open(config_path, 'r', encoding='utf-8') as file:
+                        config_data = json.load(file)
+                except ValueError:
+                    if cached is None:
+                        raise
+                    # Most likely caught mid-save; keep the last good config and retry next time
+                    return cached[2]
+
+            merged_config = deepcopy(config_data) if isinstance(config_data, dict) else {}
+            Helper._apply_env_overrides(merged_config)
+            Helper._config_cache[config_filename] = (config_path, stamp, merged_config)
+            changed = cached is not None and cached[2] != merged_config
+            subscribers = list(Helper._config_subscribers) if changed else []
+
+        for callback in subscribers:
+            callback(deepcopy(merged_config))
         return merged_config
     
     @staticmethod
@@ -41,7 +100,7 @@ class Helper:
 
     @staticmethod
     def get_station_names():
-        config = Helper.load_config()
+        config = Helper._cached_config()
         stations = config.get('stations') or []
         station_names = [station_info['name'] for station_info in stations if station_info.get('name')]
         return station_names
@@ -80,6 +139,9 @@ class Helper:
     def _apply_env_overrides(config):
         """Apply environment variable overrides to the mutable config dict."""
 
+        def as_bool(raw_value):
+            return raw_value.strip().lower() in ('1', 'true', 'yes', 'on')
+
         def set_if_env(section, key, env_var, cast=None):
             raw_value = os.getenv(env_var)
             if raw_value in (None, ''):
@@ -104,7 +166,26 @@ class Helper:
         set_if_env('postgres', 'database', 'POSTGRES_DB')
         set_if_env('postgres', 'user', 'POSTGRES_USER')
         set_if_env('postgres', 'password', 'POSTGRES_PASSWORD')
+        set_if_env('postgres', 'pool_size', 'POSTGRES_POOL_SIZE', int)
+        set_if_env('postgres', 'statement_timeout_ms', 'POSTGRES_STATEMENT_TIMEOUT_MS', int)
 
         set_if_env('elastic', 'url', 'ELASTIC_URL')
         set_if_env('elastic', 'user', 'ELASTIC_USER')
-        set_if_env('elastic', 'password', 'ELASTIC_PASSWORD')
\ No newline at end of file
+        set_if_env('elastic', 'password', 'ELASTIC_PASSWORD')
+
+        set_if_env('worker', 'max_concurrency', 'WORKER_MAX_CONCURRENCY', int)
+        set_if_env('worker', 'stream_buffer_seconds', 'WORKER_STREAM_BUFFER_SECONDS', int)
+        set_if_env('worker', 'similarity_threshold', 'WORKER_SIMILARITY_THRESHOLD', float)
+        set_if_env('worker', 'similarity_max_skip_seconds', 'WORKER_SIMILARITY_MAX_SKIP_SECONDS', int)
+        set_if_env('worker', 'skip_non_music', 'WORKER_SKIP_NON_MUSIC', as_bool)
+        set_if_env('worker', 'non_music_max_skip_seconds', 'WORKER_NON_MUSIC_MAX_SKIP_SECONDS', int)
+        set_if_env('worker', 'poll_interval_seconds', 'WORKER_POLL_INTERVAL_SECONDS', int)
+        set_if_env('worker', 'max_poll_interval_seconds', 'WORKER_MAX_POLL_INTERVAL_SECONDS', int)
+        set_if_env('worker', 'resolution_cache_size', 'WORKER_RESOLUTION_CACHE_SIZE', int)
+        set_if_env('worker', 'resolution_cache_ttl_hours', 'WORKER_RESOLUTION_CACHE_TTL_HOURS', int)
+        set_if_env('worker', 'resolution_cache_negative_ttl_hours', 'WORKER_RESOLUTION_CACHE_NEGATIVE_TTL_HOURS', int)
+        set_if_env('worker', 'audio_workers', 'WORKER_AUDIO_WORKERS', int)
+        set_if_env('worker', 'play_flush_batch_size', 'WORKER_PLAY_FLUSH_BATCH_SIZE', int)
+        set_if_env('worker', 'play_max_pending', 'WORKER_PLAY_MAX_PENDING', int)
+        set_if_env('worker', 'state_backend', 'WORKER_STATE_BACKEND')
+        set_if_env('worker', 'state_flush_seconds', 'WORKER_STATE_FLUSH_SECONDS', float)
\ No newline at end of file
@@ -3,34 +3,41 @@ import json
 import logging
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, date
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 try:
-    from elasticsearch import Elasticsearch, helpers  # type: ignore
+    from elasticsearch import Elasticsearch  # type: ignore
 except ImportError as exc:  # pragma: no cover
     raise RuntimeError(
         "Missing dependency 'elasticsearch'. Install it in your environment before running the migration."
     ) from exc
 
 import psycopg2
-from psycopg2.extras import Json, execute_values
+from psycopg2.extras import Json
 
 BACKEND_RECOGNIZE = Path(__file__).resolve().parents[1]
 if str(BACKEND_RECOGNIZE) not in sys.path:
     sys.path.append(str(BACKEND_RECOGNIZE))
 
+from bulk_loader import BulkLoader  # pylint: disable=wrong-import-position
 from helper import Helper  # pylint: disable=wrong-import-position
+from postgres_pool import PostgresPool  # pylint: disable=wrong-import-position
 
 STATION_ALIASES = {
     "plays_index": "glglz",
     "radius100_plays_index": "100fm",
 }
 
-DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_SIZE = 5000
 DEFAULT_PREVIEW_SIZE = 5
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+MAX_PAGE_SIZE = 10000  # Elasticsearch's default index.max_result_window
 
 
 @dataclass
@@ -42,6 +49,9 @@ class MigrationArgs:
     limit_plays: Optional[int]
     preview: bool
     preview_size: int
+    workers: int
+    resume: bool = False
+    incremental: bool = False
 
 
 @dataclass
@@ -52,6 +62,135 @@ class MigrationStats:
     plays_written: int = 0
 
 
+class Quota:
+    """Thread-safe countdown shared by the slices that read one index."""
+
+    def __init__(self, limit: Optional[int]):
+        self.remaining = limit
+        self._lock = threading.Lock()
+
+    def take(self, count: int) -> int:
+        if self.remaining is None:
+            return count
+        with self._lock:
+            granted = min(count, self.remaining)
+            self.remaining -= granted
+            return granted
+
+
+class IndexCheckpoint:
+    """How far every slice of one plays index has been committed, as `played_at` high-water marks.
+
+    Slices read in `played_at` order, so everything up to a slice's mark is in
+    Postgres. The index can be resumed from the lowest mark across slices; a
+    slice that read to its end no longer holds the others back.
+    """
+
+    def __init__(self, index: str, slices: int, start: Optional[datetime], save: Callable[[str, Optional[datetime], bool], None]):
+        self.index = index
+        self.start = start
+        self._save = save
+        self._marks: Dict[int, Optional[datetime]] = {slice_id: None for slice_id in range(slices)}
+        self._finished: Set[int] = set()
+        self._latest = start
+        self._saved = start
+        self._lock = threading.Lock()
+
+    def committed(self, slice_id: int, played_at: datetime) -> None:
+        with self._lock:
+            self._marks[slice_id] = played_at
+            self._latest = max(filter(None, (self._latest, played_at)))
+            self._save_progress()
+
+    def finished(self, slice_id: int) -> None:
+        with self._lock:
+            self._finished.add(slice_id)
+            if len(self._finished) == len(self._marks):
+                # Everything up to the newest play read is in; an incremental run continues from there
+                self._save(self.index, self._latest, True)
+            else:
+                self._save_progress()
+
+    def _save_progress(self) -> None:
+        pending = [mark for slice_id, mark in self._marks.items() if slice_id not in self._finished]
+        if not pending or None in pending:
+            return
+        resume_at = min(pending)
+        if self._saved is None or resume_at > self._saved:
+            self._save(self.index, resume_at, False)
+            self._saved = resume_at
+
+
+class SlicedIndexReader:
+    """Exports an index through one point in time split into parallel slices.
+
+    Each slice pages with search_after, by default on `_shard_doc`, the
+    cheapest sort Elasticsearch offers, so slices need no coordination and
+    hits arrive unordered across slices. The point in time is opened by the
+    first slice and closed once every slice has finished.
+    """
+
+    KEEP_ALIVE = "5m"
+
+    def __init__(
+        self,
+        es: Elasticsearch,
+        index: str,
+        slices: int,
+        page_size: int,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Any]] = None,
+    ):
+        self.es = es
+        self.index = index
+        self.slices = max(1, slices)
+        self.page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        self.query = query
+        self.sort = sort or ["_shard_doc"]
+        self._pit_id: Optional[str] = None
+        self._unfinished = self.slices
+        self._lock = threading.Lock()
+
+    def read_slice(self, slice_id: int, handle_page: Callable[[List[dict]], bool]) -> None:
+        """Feeds the slice's hits to `handle_page` page by page until it returns False or the slice ends."""
+        try:
+            search_after = None
+            while True:
+                response = self.es.search(
+                    pit={"id": self._open(), "keep_alive": self.KEEP_ALIVE},
+                    slice={"id": slice_id, "max": self.slices} if self.slices > 1 else None,
+                    sort=self.sort,
+                    query=self.query,
+                    search_after=search_after,
+                    size=self.page_size,
+                    track_total_hits=False,
+                )
+                with self._lock:
+                    self._pit_id = response.get("pit_id") or self._pit_id
+                hits = response["hits"]["hits"]
+                if not hits or handle_page(hits) is False or len(hits) < self.page_size:
+                    return
+                search_after = hits[-1]["sort"]
+        finally:
+            self._finish()
+
+    def _open(self) -> str:
+        with self._lock:
+            if self._pit_id is None:
+                self._pit_id = self.es.open_point_in_time(index=self.index, keep_alive=self.KEEP_ALIVE)["id"]
+            return self._pit_id
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._unfinished -= 1
+            pit_id = self._pit_id if self._unfinished == 0 else None
+        if pit_id:
+            try:
+                self.es.close_point_in_time(id=pit_id)
+            except Exception:  # pylint: disable=broad-except
+                pass  # expires with its keep-alive anyway
+
+
 class ElasticSong:
     def __init__(self, payload: Dict[str, object], fallback_id: Optional[str] = None):
         self.payload = payload
@@ -99,9 +238,12 @@ class Migrator:
         self.args = args
         self.logger = self._configure_logging()
         self.es = self._create_elastic_client()
-        self.pg_conn = self._create_pg_connection()
+        self.pg_pool = self._create_pg_pool()
         self.stats = MigrationStats()
         self.station_map = self._load_station_map()
+        self._stats_lock = threading.Lock()
+        self._failed = threading.Event()
+        self.checkpoints = self._load_checkpoints()
 
     def _configure_logging(self) -> logging.Logger:
         logger = logging.getLogger("es_to_postgres")
@@ -122,180 +264,285 @@ class Migrator:
             kwargs["basic_auth"] = (user, password)
         return Elasticsearch(**kwargs)
 
-    def _create_pg_connection(self) -> psycopg2.extensions.connection:
-        config = Helper.load_config().get("postgres", {})
-        conn = psycopg2.connect(
-            host=config.get("host", os.getenv("POSTGRES_HOST", "localhost")),
-            port=config.get("port", os.getenv("POSTGRES_PORT", 5432)),
-            database=config.get("database", os.getenv("POSTGRES_DB", "radio_plays")),
-            user=config.get("user", os.getenv("POSTGRES_USER", "postgres")),
-            password=config.get("password", os.getenv("POSTGRES_PASSWORD", "postgres")),
-            options="-c timezone=Asia/Jerusalem",
-        )
-        conn.autocommit = False
-        return conn
+    def _create_pg_pool(self) -> PostgresPool:
+        # Each batch borrows a connection, so a dropped connection costs one retried batch
+        return PostgresPool.from_config(self.logger)
 
     def _load_station_map(self) -> Dict[str, int]:
-        station_map: Dict[str, int] = {}
-        with self.pg_conn.cursor() as cur:
-            cur.execute("SELECT id, name FROM stations")
-            for station_id, name in cur.fetchall():
-                station_map[str(name)] = int(station_id)
-        return station_map
+        def read(conn: psycopg2.extensions.connection) -> List[Tuple[int, str]]:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id, name FROM stations")
+                return cur.fetchall()
+
+        return {str(name): int(station_id) for station_id, name in self.pg_pool.run(read)}
 
     def close(self) -> None:
         try:
-            self.pg_conn.close()
+            self.pg_pool.close()
         finally:
             self.es.close()
 
     def migrate(self) -> MigrationStats:
         self.logger.info(
-            "Starting migration | dry_run=%s | batch_size=%s | stations=%s",
+            "Starting migration | dry_run=%s | batch_size=%s | workers=%s | mode=%s | stations=%s",
             self.args.dry_run,
             self.args.batch_size,
+            self.args.workers,
+            "incremental" if self.args.incremental else "resume" if self.args.resume else "full",
             ",".join(self.args.station) if self.args.station else "all",
         )
         try:
             self._migrate_songs()
             self._migrate_plays()
-            self.pg_conn.commit()
-        except Exception:
-            self.pg_conn.rollback()
-            raise
         finally:
             self.close()
         return self.stats
 
     def _migrate_songs(self) -> None:
+        if self.args.incremental:
+            # Songs carry no timestamp to sync by; plays backfill any song they reference that is missing
+            self.logger.info("Incremental mode: skipping songs_index, new songs are backfilled from plays")
+            return
+        if self.args.resume and self.checkpoints.get("songs_index", (None, False))[1]:
+            self.logger.info("Resuming: songs_index already migrated")
+            return
         self.logger.info("Migrating songs from songs_index")
-        iterator = helpers.scan(self.es, index="songs_index", preserve_order=True)
-        iterator = self._limit(iterator, self.args.limit_songs)
-        for batch in self._chunk(iterator, self.args.batch_size):
-            song_models = []
-            for hit in batch:
-                source = hit.get("_source")
-                if not isinstance(source, dict):
-                    continue
-                fallback_id = hit.get("_id")
-                song_models.append(
-                    ElasticSong(source, fallback_id=str(fallback_id) if fallback_id else None)
-                )
-            self.stats.songs_processed += len(song_models)
-            self.logger.info(
-                "Songs batch processed | batch_size=%s | processed_total=%s",
-                len(song_models),
-                self.stats.songs_processed,
-            )
-            if not song_models:
-                continue
-            if self.args.dry_run:
-                if self.args.preview:
-                    self._preview_song_batch(song_models)
-                self.logger.info("Dry run enabled: skipping song writes for this batch")
+        self._save_checkpoint("songs_index", None, False)
+        reader = SlicedIndexReader(self.es, "songs_index", self.args.workers, self.args.batch_size)
+        quota = Quota(self.args.limit_songs)
+        self._run_parallel(
+            [partial(reader.read_slice, slice_id, partial(self._migrate_song_page, quota)) for slice_id in range(reader.slices)]
+        )
+        if quota.remaining is None:
+            self._save_checkpoint("songs_index", None, True)
+
+    def _migrate_song_page(self, quota: Quota, hits: List[dict]) -> bool:
+        hits = hits[: quota.take(len(hits))]
+        if not hits or self._failed.is_set():
+            return False
+        song_models = []
+        for hit in hits:
+            source = hit.get("_source")
+            if not isinstance(source, dict):
                 continue
-            albums = self._prepare_album_rows(song_models)
-            artists = self._prepare_artist_rows(song_models)
-            song_rows = self._prepare_song_rows(song_models)
-            song_artist_rows = self._prepare_song_artist_rows(song_models)
-            with self.pg_conn:
-                with self.pg_conn.cursor() as cur:
-                    if albums:
-                        self._upsert_albums(cur, albums)
-                    if artists:
-                        self._upsert_artists(cur, artists)
-                    if song_rows:
-                        self._upsert_songs(cur, song_rows)
-                    if song_artist_rows:
-                        self._insert_song_artists(cur, song_artist_rows)
-            self.stats.songs_written += len(song_rows)
-            self.logger.info(
-                "Songs batch written | songs=%s | albums=%s | artists=%s",
-                len(song_rows),
-                len(albums),
-                len(artists),
+            fallback_id = hit.get("_id")
+            song_models.append(
+                ElasticSong(source, fallback_id=str(fallback_id) if fallback_id else None)
             )
+        processed_total = self._count("songs_processed", len(song_models))
+        self.logger.info(
+            "Songs batch processed | batch_size=%s | processed_total=%s",
+            len(song_models),
+            processed_total,
+        )
+        if not song_models:
+            return True
+        if self.args.dry_run:
+            if self.args.preview:
+                self._preview_song_batch(song_models)
+            self.logger.info("Dry run enabled: skipping song writes for this batch")
+            return True
+        albums = self._prepare_album_rows(song_models)
+        artists = self._prepare_artist_rows(song_models)
+        song_rows = self._prepare_song_rows(song_models)
+        song_artist_rows = self._prepare_song_artist_rows(song_models)
+        self._write_songs(albums, artists, song_rows, song_artist_rows)
+        self._count("songs_written", len(song_rows))
+        self.logger.info(
+            "Songs batch written | songs=%s | albums=%s | artists=%s",
+            len(song_rows),
+            len(albums),
+            len(artists),
+        )
+        return True
 
     def _migrate_plays(self) -> None:
         indices = self._plays_indices()
         if self.args.station:
             indices = [idx for idx in indices if self._resolve_station_name(idx) in self.args.station]
+        # Every slice of every index is queued at once, so several indices are in flight together
+        tasks: List[Callable[[], None]] = []
         for index in indices:
             station_name = self._resolve_station_name(index)
             station_id = self._station_id_for_name(station_name)
-            self.logger.info("Migrating plays | index=%s | station=%s", index, station_name)
-            iterator = helpers.scan(self.es, index=index, preserve_order=True)
-            iterator = self._limit(iterator, self.args.limit_plays)
-            for batch in self._chunk(iterator, self.args.batch_size):
-                rows = []
-                for hit in batch:
-                    doc = hit["_source"]
-                    song_id = doc.get("song_id")
-                    played_at_raw = doc.get("played_at")
-                    if not song_id or not played_at_raw:
-                        continue
-                    played_at = self._parse_played_at(str(played_at_raw))
-                    rows.append((song_id, station_id, played_at))
-                self.stats.plays_processed += len(batch)
-                self.logger.info(
-                    "Plays batch processed | index=%s | batch_size=%s | processed_total=%s",
-                    index,
-                    len(batch),
-                    self.stats.plays_processed,
+            start = self._plays_start(index)
+            if start is False:
+                self.logger.info("Resuming: index=%s already migrated", index)
+                continue
+            self.logger.info(
+                "Migrating plays | index=%s | station=%s | from=%s",
+                index,
+                station_name,
+                start.isoformat() if start else "beginning",
+            )
+            reader = SlicedIndexReader(
+                self.es,
+                index,
+                self.args.workers,
+                self.args.batch_size,
+                query={"range": {"played_at": {"gte": start.isoformat()}}} if start else None,
+                sort=[{"played_at": "asc"}, "_shard_doc"],
+            )
+            checkpoint = IndexCheckpoint(index, reader.slices, start, self._save_checkpoint)
+            if not start:
+                self._save_checkpoint(index, None, False)
+            quota = Quota(self.args.limit_plays)
+            tasks.extend(
+                partial(self._read_play_slice, reader, slice_id, index, station_id, quota, checkpoint)
+                for slice_id in range(reader.slices)
+            )
+        self._run_parallel(tasks)
+
+    def _plays_start(self, index: str):
+        """Where to start reading an index: None for the beginning, False to skip it."""
+        played_at, completed = self.checkpoints.get(index, (None, False))
+        if self.args.incremental:
+            return played_at
+        if self.args.resume:
+            return False if completed else played_at
+        return None
+
+    def _read_play_slice(
+        self,
+        reader: SlicedIndexReader,
+        slice_id: int,
+        index: str,
+        station_id: int,
+        quota: Quota,
+        checkpoint: IndexCheckpoint,
+    ) -> None:
+        reader.read_slice(slice_id, partial(self._migrate_play_page, index, station_id, quota, checkpoint, slice_id))
+        if not self._failed.is_set() and quota.remaining is None:
+            checkpoint.finished(slice_id)
+
+    def _migrate_play_page(
+        self,
+        index: str,
+        station_id: int,
+        quota: Quota,
+        checkpoint: IndexCheckpoint,
+        slice_id: int,
+        hits: List[dict],
+    ) -> bool:
+        hits = hits[: quota.take(len(hits))]
+        if not hits or self._failed.is_set():
+            return False
+        rows = []
+        for hit in hits:
+            doc = hit["_source"]
+            song_id = doc.get("song_id")
+            played_at_raw = doc.get("played_at")
+            if not song_id or not played_at_raw:
+                continue
+            played_at = self._parse_played_at(str(played_at_raw))
+            rows.append((song_id, station_id, played_at))
+        processed_total = self._count("plays_processed", len(hits))
+        self.logger.info(
+            "Plays batch processed | index=%s | batch_size=%s | processed_total=%s",
+            index,
+            len(hits),
+            processed_total,
+        )
+        if self.args.dry_run or not rows:
+            if self.args.dry_run and rows:
+                if self.args.preview:
+                    self._preview_play_batch(rows)
+                self.logger.info("Dry run enabled: skipping play writes for this batch")
+            return True
+        high_water = max(row[2] for row in rows)
+        missing_ids = self._ensure_songs_exist([row[0] for row in rows])
+        if missing_ids:
+            skipped_rows = [row for row in rows if row[0] in missing_ids]
+            if skipped_rows:
+                rows = [row for row in rows if row[0] not in missing_ids]
+                self.logger.warning(
+                    "Skipping %s plays referencing songs missing from all sources: %s",
+                    len(skipped_rows),
+                    list(missing_ids)[:5],
                 )
-                if self.args.dry_run or not rows:
-                    if self.args.dry_run and rows:
-                        if self.args.preview:
-                            self._preview_play_batch(rows)
-                        self.logger.info("Dry run enabled: skipping play writes for this batch")
-                    continue
-                missing_ids = self._ensure_songs_exist([row[0] for row in rows])
-                if missing_ids:
-                    skipped_rows = [row for row in rows if row[0] in missing_ids]
-                    if skipped_rows:
-                        rows = [row for row in rows if row[0] not in missing_ids]
-                        self.logger.warning(
-                            "Skipping %s plays referencing songs missing from all sources: %s",
-                            len(skipped_rows),
-                            list(missing_ids)[:5],
+        if rows:
+            self.pg_pool.run(lambda conn: self._insert_plays_with(conn, rows))
+            self._count("plays_written", len(rows))
+            self.logger.info(
+                "Plays batch written | index=%s | rows=%s",
+                index,
+                len(rows),
+            )
+        checkpoint.committed(slice_id, high_water)
+        return True
+
+    def _run_parallel(self, tasks: Sequence[Callable[[], Any]]) -> None:
+        """Runs slice readers on `workers` threads; the first failure stops the others after their current page."""
+        with ThreadPoolExecutor(max_workers=self.args.workers, thread_name_prefix="es-slice") as executor:
+            futures = [executor.submit(task) for task in tasks]
+            errors = []
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    self._failed.set()
+                    errors.append(exc)
+        if errors:
+            raise errors[0]
+
+    def _count(self, field: str, amount: int) -> int:
+        with self._stats_lock:
+            total = getattr(self.stats, field) + amount
+            setattr(self.stats, field, total)
+            return total
+
+    def _load_checkpoints(self) -> Dict[str, Tuple[Optional[datetime], bool]]:
+        def read(conn: psycopg2.extensions.connection) -> List[Tuple[str, Optional[datetime], bool]]:
+            with conn.cursor() as cur:
+                if not self.args.dry_run:
+                    cur.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS migration_checkpoints (
+                            index_name TEXT PRIMARY KEY,
+                            played_at TIMESTAMP,
+                            completed BOOLEAN NOT NULL DEFAULT FALSE,
+                            updated_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
                         )
-                if not rows:
-                    continue
-                with self.pg_conn:
-                    with self.pg_conn.cursor() as cur:
-                        self._insert_plays(cur, rows)
-                self.stats.plays_written += len(rows)
-                self.logger.info(
-                    "Plays batch written | index=%s | rows=%s",
-                    index,
-                    len(rows),
+                        """
+                    )
+                cur.execute("SELECT to_regclass('migration_checkpoints') IS NOT NULL")
+                if not cur.fetchone()[0]:
+                    return []
+                cur.execute("SELECT index_name, played_at, completed FROM migration_checkpoints")
+                return cur.fetchall()
+
+        return {index: (played_at, bool(completed)) for index, played_at, completed in self.pg_pool.run(read)}
+
+    def _save_checkpoint(self, index: str, played_at: Optional[datetime], completed: bool) -> None:
+        if self.args.dry_run:
+            return
+
+        def write(conn: psycopg2.extensions.connection) -> None:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO migration_checkpoints (index_name, played_at, completed)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (index_name) DO UPDATE SET
+                        played_at = EXCLUDED.played_at,
+                        completed = EXCLUDED.completed,
+                        updated_at = LOCALTIMESTAMP
+                    """,
+                    (index, played_at, completed),
                 )
 
+        self.pg_pool.run(write)
+        self.logger.info(
+            "Checkpoint saved | index=%s | played_at=%s | completed=%s",
+            index,
+            played_at.isoformat() if played_at else None,
+            completed,
+        )
+
     def _plays_indices(self) -> List[str]:
         response = self.es.indices.get_alias(index="*plays_index")
         return sorted(response.keys())
 
-    @staticmethod
-    def _limit(iterator: Iterator[dict], limit: Optional[int]) -> Iterator[dict]:
-        if limit is None:
-            yield from iterator
-            return
-        for count, item in enumerate(iterator, start=1):
-            if count > limit:
-                break
-            yield item
-
-    @staticmethod
-    def _chunk(iterator: Iterable[dict], size: int) -> Iterator[List[dict]]:
-        bucket: List[dict] = []
-        for item in iterator:
-            bucket.append(item)
-            if len(bucket) >= size:
-                yield bucket
-                bucket = []
-        if bucket:
-            yield bucket
-
     def _prepare_album_rows(self, songs: Sequence[ElasticSong]) -> List[Tuple[str, str, Optional[date]]]:
         albums: Dict[str, Tuple[str, str, Optional[date]]] = {}
         for song in songs:
@@ -382,9 +629,13 @@ class Migrator:
             return set()
 
         ids_list = list(unique_ids)
-        with self.pg_conn.cursor() as cur:
-            cur.execute("SELECT id FROM songs WHERE id = ANY(%s)", (ids_list,))
-            existing = {row[0] for row in cur.fetchall()}
+
+        def read(conn: psycopg2.extensions.connection) -> Set[str]:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id FROM songs WHERE id = ANY(%s)", (ids_list,))
+                return {row[0] for row in cur.fetchall()}
+
+        existing = self.pg_pool.run(read)
 
         missing: Set[str] = {sid for sid in unique_ids if sid not in existing}
         if not missing:
@@ -419,18 +670,9 @@ class Migrator:
         inserted_ids: Set[str] = {row[0] for row in song_rows}
 
         if song_rows:
-            with self.pg_conn:
-                with self.pg_conn.cursor() as cur:
-                    if albums:
-                        self._upsert_albums(cur, albums)
-                    if artists:
-                        self._upsert_artists(cur, artists)
-                    if song_rows:
-                        self._upsert_songs(cur, song_rows)
-                    if song_artist_rows:
-                        self._insert_song_artists(cur, song_artist_rows)
-
-            self.stats.songs_written += len(song_rows)
+            self._write_songs(albums, artists, song_rows, song_artist_rows)
+
+            self._count("songs_written", len(song_rows))
             self.logger.info("Backfilled %s songs referenced by plays", len(song_rows))
 
         missing_after_fetch = missing - inserted_ids
@@ -485,76 +727,32 @@ class Migrator:
             raise KeyError(f"Station '{resolved}' is not present in Postgres. Add it before migrating.")
         return station_id
 
-    def _upsert_albums(self, cur: psycopg2.extensions.cursor, rows: Sequence[Tuple[str, str, Optional[date]]]) -> None:
-        execute_values(
-            cur,
-            """
-            INSERT INTO albums (id, name, release_date)
-            VALUES %s
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                release_date = COALESCE(EXCLUDED.release_date, albums.release_date),
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            rows,
-            page_size=self.args.batch_size,
-        )
-
-    def _upsert_artists(self, cur: psycopg2.extensions.cursor, rows: Sequence[Tuple[str, str]]) -> None:
-        execute_values(
-            cur,
-            """
-            INSERT INTO artists (id, name)
-            VALUES %s
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            rows,
-            page_size=self.args.batch_size,
-        )
-
-    def _upsert_songs(self, cur: psycopg2.extensions.cursor, rows: Sequence[Tuple[str, str, Optional[str], int, int, Json]]) -> None:
-        execute_values(
-            cur,
-            """
-            INSERT INTO songs (id, name, album_id, duration_ms, popularity, external_links)
-            VALUES %s
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                album_id = EXCLUDED.album_id,
-                duration_ms = EXCLUDED.duration_ms,
-                popularity = EXCLUDED.popularity,
-                external_links = EXCLUDED.external_links,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            rows,
-            page_size=self.args.batch_size,
-        )
+    def _write_songs(
+        self,
+        albums: Sequence[Tuple[str, str, Optional[date]]],
+        artists: Sequence[Tuple[str, str]],
+        song_rows: Sequence[Tuple[str, str, Optional[str], int, int, Json]],
+        song_artist_rows: Sequence[Tuple[str, str, int]],
+    ) -> None:
+        def write(conn: psycopg2.extensions.connection) -> None:
+            loader = BulkLoader(conn)
+            if artists:
+                loader.load("artists", ("id", "name"), artists)
+            if albums:
+                loader.load("albums", ("id", "name", "release_date"), albums)
+            if song_rows:
+                loader.load(
+                    "songs",
+                    ("id", "name", "album_id", "duration_ms", "popularity", "external_links"),
+                    song_rows,
+                )
+            if song_artist_rows:
+                loader.load("song_artists", ("song_id", "artist_id", "artist_order"), song_artist_rows)
 
-    def _insert_song_artists(self, cur: psycopg2.extensions.cursor, rows: Sequence[Tuple[str, str, int]]) -> None:
-        execute_values(
-            cur,
-            """
-            INSERT INTO song_artists (song_id, artist_id, artist_order)
-            VALUES %s
-            ON CONFLICT (song_id, artist_id) DO NOTHING
-            """,
-            rows,
-            page_size=self.args.batch_size,
-        )
+        self.pg_pool.run(write)
 
-    def _insert_plays(self, cur: psycopg2.extensions.cursor, rows: Sequence[Tuple[str, int, datetime]]) -> None:
-        execute_values(
-            cur,
-            """
-            INSERT INTO plays (song_id, station_id, played_at)
-            VALUES %s
-            ON CONFLICT (song_id, station_id, played_at) DO NOTHING
-            """,
-            rows,
-            page_size=self.args.batch_size,
-        )
+    def _insert_plays_with(self, conn: psycopg2.extensions.connection, rows: Sequence[Tuple[str, int, datetime]]) -> None:
+        BulkLoader(conn).load("plays", ("song_id", "station_id", "played_at"), rows)
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> MigrationArgs:
@@ -565,6 +763,23 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> MigrationArgs:
     parser.add_argument("--limit-songs", type=int, help="Process only the first N songs")
     parser.add_argument("--limit-plays", type=int, help="Process only the first N plays per index")
     parser.add_argument("--preview", action="store_true", help="Log transformed rows during dry run")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Parallel slices read per index (and threads writing them)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip indices a previous run completed and continue the others from their checkpoint",
+    )
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Copy only plays at or after each index's last checkpoint (songs are backfilled from plays)",
+    )
     parser.add_argument(
         "--preview-size",
         type=int,
@@ -580,6 +795,9 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> MigrationArgs:
         limit_plays=parsed.limit_plays,
         preview=parsed.preview,
         preview_size=max(1, parsed.preview_size),
+        workers=max(1, parsed.workers),
+        resume=parsed.resume,
+        incremental=parsed.incremental,
     )
 
 
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from postgres_pool import PostgresPool
+
+SpooledPlay = Tuple[int, Dict[str, Any], Optional[str]]  # (end offset, record, station)
+
+
+class PlaySpool:
+    """Append-only JSON-lines file of plays that are not yet in Postgres.
+
+    Appends are written straight away and fsynced in batches by `checkpoint()`,
+    which also persists the byte offset of the last play known to be in the
+    database to a side file, so after a crash everything past it is replayed.
+    Acknowledging plays only updates memory; a replay of plays acknowledged
+    since the last checkpoint is harmless as play inserts are idempotent. Once
+    every spooled play is acknowledged, `compact()` truncates the file, which
+    keeps it small in normal operation.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset_path = f'{path}.offset'
+        self.pending: Deque[SpooledPlay] = deque()
+        self._file = None
+        self._size = 0
+        self._acked = 0
+        self._unsynced = False
+        self._offset_dirty = False
+
+    def open(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._acked = self._read_offset()
+        self._file = open(self.path, 'a+b')
+        self._file.seek(0)
+        data = self._file.read()
+
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            # A torn append from a crash; the play was never acknowledged to anyone
+            self._file.truncate(complete)
+        if self._acked > complete:
+            self._acked = 0  # the spool was compacted before the offset file was rewritten
+
+        position = self._acked
+        for line in data[self._acked:complete].splitlines(keepends=True):
+            position += len(line)
+            entry = json.loads(line)
+            self.pending.append((position, entry['record'], entry.get('station')))
+        self._size = complete
+        self._file.seek(0, os.SEEK_END)
+
+    def append(self, record: Dict[str, Any], station: Optional[str]) -> None:
+        line = json.dumps({'record': record, 'station': station}, ensure_ascii=False).encode('utf-8') + b'\n'
+        self._file.write(line)
+        self._size += len(line)
+        self._unsynced = True
+        self.pending.append((self._size, record, station))
+
+    def sync(self) -> None:
+        """Flushes and fsyncs everything appended since the last sync."""
+        if not self._unsynced:
+            return
+        self._unsynced = False  # cleared first so an append racing the fsync is synced next time
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def peek(self, limit: int) -> List[SpooledPlay]:
+        return [self.pending[i] for i in range(min(limit, len(self.pending)))]
+
+    def ack(self, count: int) -> None:
+        """Marks the oldest `count` pending plays as written to the database; `checkpoint()` persists it."""
+        for _ in range(count):
+            self._acked = self.pending.popleft()[0]
+        self._offset_dirty = True
+
+    def checkpoint(self) -> None:
+        """Fsyncs appended plays, then persists the acknowledged offset if it moved."""
+        self.sync()
+        if self._offset_dirty:
+            self._offset_dirty = False  # cleared first so an ack racing the write is persisted next time
+            self._write_offset()
+
+    @property
+    def compactable(self) -> bool:
+        return not self.pending and self._size > 0
+
+    def compact(self) -> None:
+        """Empties a fully acknowledged spool; the caller must keep appends out until it returns."""
+        self._file.truncate(0)
+        self._size = 0
+        self._acked = 0
+        self._offset_dirty = False
+        self._write_offset()
+
+    def close(self) -> None:
+        if self._file:
+            self.checkpoint()
+            self._file.close()
+            self._file = None
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, 'r', encoding='utf-8') as file:
+                return max(0, int(file.read().strip() or 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self) -> None:
+        temp_path = f'{self.offset_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(str(self._acked))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.offset_path)
+
+
+class PlayWriter:
+    """Write-behind queue that moves recognized plays from the spool into Postgres.
+
+    `submit` only touches the local spool, so recognition never waits on the
+    database. A background flusher drains the spool in batches on a pooled
+    connection and retries with backoff while Postgres is unavailable. When the
+    backlog reaches `max_pending`, `submit` waits for the flusher (back-pressure)
+    instead of letting the spool grow without bound. Only a lost connection is
+    retried; plays the database keeps failing (constraint violations, statement
+    timeouts) are moved to a dead-letter file next to the spool.
+    """
+
+    FSYNC_INTERVAL_SECONDS = 1.0
+    RETRY_BACKOFF = (1, 60)  # (initial, max) seconds
+
+    def __init__(
+        self,
+        connector_factory: Callable[[], Any],
+        spool_path: str,
+        batch_size: int = 100,
+        max_pending: int = 10000,
+        logger=None
+    ):
+        self.connector_factory = connector_factory
+        self.spool = PlaySpool(spool_path)
+        self.rejected_path = f'{spool_path}.rejected'
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.logger = logger
+        self._connector = None
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Condition()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self.spool.pending)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self.spool.open()
+        if self.spool.pending and self.logger:
+            self.logger.info(
+                f"Resuming {self.pending} spooled plays from {self.spool.path}",
+                extra={'station': 'system'}
+            )
+        self._tasks = [
+            asyncio.create_task(self._flush_loop(), name='play-writer-flush'),
+            asyncio.create_task(self._sync_loop(), name='play-writer-fsync'),
+        ]
+        self._wakeup.set()
+
+    async def submit(self, record: Dict[str, Any], station: Optional[str]) -> None:
+        async with self._drained:
+            await self._drained.wait_for(lambda: self.pending < self.max_pending)
+            self.spool.append(record, station)
+        self._wakeup.set()
+
+    async def close(self, timeout: float = 10) -> None:
+        """Gives the flusher `timeout` seconds to drain, then stops; anything left stays spooled."""
+        if not self._tasks:
+            return
+        try:
+            async with self._drained:
+                await asyncio.wait_for(self._drained.wait_for(lambda: self.pending == 0), timeout=timeout)
+        except asyncio.TimeoutError:
+            if self.logger:
+                self.logger.warning(
+                    f"Stopping with {self.pending} plays still spooled; they are written on next start",
+                    extra={'station': 'system'}
+                )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.spool.close)
+        if self._connector is not None:
+            await asyncio.to_thread(self._connector.close)
+            self._connector = None
+
+    async def _sync_loop(self) -> None:
+        """Moves all spool disk I/O besides appends off the event loop, once per interval."""
+        while True:
+            await asyncio.sleep(self.FSYNC_INTERVAL_SECONDS)
+            if self.spool.compactable:
+                async with self._drained:  # submit() appends under the same lock
+                    if self.spool.compactable:
+                        await asyncio.to_thread(self.spool.compact)
+            await asyncio.to_thread(self.spool.checkpoint)
+
+    async def _flush_loop(self) -> None:
+        backoff, max_backoff = self.RETRY_BACKOFF
+        while True:
+            if not self.spool.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            batch = self.spool.peek(self.batch_size)
+            try:
+                written = await asyncio.to_thread(self._write_batch, [(record, station) for _, record, station in batch])
+            except Exception as exc:
+                if self.logger:
+                    self.logger.warning(
+                        f"Failed writing {len(batch)} spooled plays, retrying in {backoff}s: {exc}",
+                        extra={'station': 'system'}
+                    )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+                continue
+
+            backoff = self.RETRY_BACKOFF[0]
+            async with self._drained:
+                self.spool.ack(written)
+                self._drained.notify_all()
+
+    def _write_batch(self, plays: List[Tuple[Dict[str, Any], Optional[str]]]) -> int:
+        """Writes a batch on the flusher's own connection, isolating plays the database rejects."""
+        if self._connector is None:
+            self._connector = self.connector_factory()  # failures propagate and the batch is retried
+        try:
+            return self._connector.index_plays(plays)
+        except Exception as exc:
+            if PostgresPool.is_connection_error(exc):
+                self._reset_connector()
+                raise
+            if len(plays) == 1:
+                self._reject(plays[0], exc)
+                return 1
+
+        for play in plays:
+            try:
+                self._connector.index_plays([play])
+            except Exception as exc:
+                if PostgresPool.is_connection_error(exc):
+                    self._reset_connector()
+                    raise
+                self._reject(play, exc)
+        return len(plays)
+
+    def _reject(self, play: Tuple[Dict[str, Any], Optional[str]], exc: Exception) -> None:
+        record, station = play
+        line = json.dumps({'record': record, 'station': station, 'error': str(exc)}, ensure_ascii=False)
+        with open(self.rejected_path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+        if self.logger:
+            self.logger.error(
+                f"Moved play the database rejected to {self.rejected_path}: {exc}",
+                extra={'station': station or 'system'}
+            )
+
+    def _reset_connector(self) -> None:
+        if self._connector is not None:
+            try:
+                self._connector.close()
+            except Exception:
+                pass
+            self._connector = None
@@ -1,348 +1,844 @@
 import json
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 
-import psycopg2
+import psycopg2.errors
 from psycopg2.extras import Json, execute_values
 
+from bulk_loader import LOAD_ORDER, BulkLoader
+from entity_cache import KnownEntityCache
 from helper import Helper
+from postgres_pool import PostgresPool
+from track_file import TrackFileReader
+
+T = TypeVar('T')
+
+DEFAULT_INGEST_BATCH_SIZE = 500
+
+
+@dataclass
+class IngestStats:
+    files: int = 0
+    plays: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+    def add(self, other: 'IngestStats') -> None:
+        self.files += other.files
+        self.plays += other.plays
+        self.skipped += other.skipped
+        self.deleted += other.deleted
+        self.failed += other.failed
+
 
 class PostgresConnector:
-    def __init__(self, station_name='glglz'):
+    MAX_INGEST_SHARD_FILES = 50
+
+    def __init__(
+        self,
+        station_name='glglz',
+        pool: Optional[PostgresPool] = None,
+        entity_cache: Optional[KnownEntityCache] = None
+    ):
         self.station_name = station_name
         log_path = os.getenv('WORKER_POSTGRES_LOG', 'postgres_indexing.log')
         self.logger = Helper.get_rotating_logger('PostgresScriptLogger', log_file=log_path)
-        self.conn = self._get_db_connection()
+        self.pool = pool or PostgresPool.shared(self.logger)
+        self.entity_cache = entity_cache or KnownEntityCache.shared()
+        self._station_ids: Dict[str, int] = {}
         self.station_id = self._get_or_create_station(station_name)
 
-    def _get_db_connection(self):
-        """Create PostgreSQL database connection"""
-        config = Helper.load_config().get('postgres', {})
-        try:
-            conn = psycopg2.connect(
-                host=config.get('host', 'localhost'),
-                port=config.get('port', 5432),
-                database=config.get('database', 'radio_plays'),
-                user=config.get('user', 'postgres'),
-                password=config.get('password', 'postgres'),
-                options='-c timezone=Asia/Jerusalem'  # Set session timezone to Israel
-            )
-            conn.autocommit = False
-            self.logger.info("Connected to PostgreSQL database")
-            return conn
-        except Exception as e:
-            self.logger.error(f"Failed to connect to PostgreSQL: {e}")
-            raise
-
     def _get_or_create_station(self, station_name):
         """Get station ID or create if doesn't exist"""
-        try:
-            with self.conn.cursor() as cur:
+        def get_or_create(conn):
+            with conn.cursor() as cur:
                 cur.execute("SELECT id FROM stations WHERE name = %s", (station_name,))
                 result = cur.fetchone()
                 if result:
-                    return result[0]
-                else:
-                    # Station doesn't exist, create it
-                    cur.execute(
-                        "INSERT INTO stations (name, display_name) VALUES (%s, %s) RETURNING id",
-                        (station_name, station_name.upper())
-                    )
-                    station_id = cur.fetchone()[0]
-                    self.conn.commit()
-                    self.logger.info(f"Created new station: {station_name} with ID {station_id}")
-                    return station_id
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error getting/creating station: {e}")
-            raise
+                    return result[0], False
+                # Station doesn't exist, create it
+                cur.execute(
+                    """INSERT INTO stations (name, display_name) VALUES (%s, %s)
+                       ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                       RETURNING id""",
+                    (station_name, station_name.upper())
+                )
+                return cur.fetchone()[0], True
 
-    def index_artists(self, artists):
-        """Insert artists if they don't exist"""
         try:
-            if not artists:
-                return
-
-            unique_artists: Dict[str, Dict[str, Optional[str]]] = {}
-            for artist in artists:
-                artist_id = artist.get('id')
-                if not artist_id:
-                    continue
-
-                existing = unique_artists.get(artist_id)
-                image_url = artist.get('image_url') or (existing or {}).get('image_url')
-
-                unique_artists[artist_id] = {
-                    'name': artist.get('name', (existing or {}).get('name')),
-                    'image_url': image_url
-                }
-
-            if not unique_artists:
-                return
-
-            with self.conn.cursor() as cur:
-                for artist_id, payload in unique_artists.items():
-                    cur.execute(
-
-                        """INSERT INTO artists (id, name, image_url)
-                               VALUES (%s, %s, %s)
-                               ON CONFLICT (id) DO UPDATE SET
-                                   name = EXCLUDED.name,
-                                   image_url = COALESCE(artists.image_url, EXCLUDED.image_url),
-                                   updated_at = CURRENT_TIMESTAMP""",
-                        (artist_id, payload.get('name'), payload.get('image_url'))
-                    )
-                self.conn.commit()
+            station_id, created = self.pool.run(get_or_create)
         except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error indexing artists: {e}")
+            self.logger.error(f"Error getting/creating station: {e}")
             raise
+        if created:
+            self.logger.info(f"Created new station: {station_name} with ID {station_id}")
+        self._station_ids[station_name] = station_id
+        return station_id
+
+    def _lookup_station_ids(self, cur, station_names: Iterable[str]) -> Dict[str, int]:
+        """Station ids by name, querying only names not resolved before"""
+        missing = [name for name in set(station_names) if name and name not in self._station_ids]
+        if missing:
+            cur.execute("SELECT name, id FROM stations WHERE name = ANY(%s)", (missing,))
+            self._station_ids.update(cur.fetchall())
+        return self._station_ids
 
     def get_artist_images(self, artist_ids: List[str]) -> Dict[str, Optional[str]]:
         """Return stored image URLs for the specified artist IDs."""
         if not artist_ids:
             return {}
 
-        try:
-            with self.conn.cursor() as cur:
+        def read(conn):
+            with conn.cursor() as cur:
                 cur.execute(
                     "SELECT id, image_url FROM artists WHERE id = ANY(%s)",
                     (artist_ids,)
                 )
                 return {artist_id: image_url for artist_id, image_url in cur.fetchall()}
+
+        try:
+            return self.pool.run(read)
         except Exception as e:
             self.logger.error(f"Error fetching artist images: {e}")
             raise
 
-    def index_album(self, album):
-        """Insert album and its artists if they don't exist"""
+    @staticmethod
+    def _parse_release_date(value):
+        if not value:
+            return None
         try:
-            with self.conn.cursor() as cur:
-                # Insert album if it doesn't exist
-                release_date = None
-                if album.get('release_date'):
-                    try:
-                        release_date = datetime.strptime(album['release_date'], "%Y-%m-%d").date()
-                    except:
-                        pass
-
-                cur.execute(
-                    """INSERT INTO albums (id, name, release_date, image_url) 
-                       VALUES (%s, %s, %s, %s)
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _values_clause(rows: List[tuple]) -> str:
+        return ', '.join('(' + ', '.join(['%s'] * len(row)) + ')' for row in rows)
+
+    def _build_song_upsert(self, song) -> Tuple[Optional[str], List, Callable[[], None]]:
+        """Build one statement that upserts the song's artists, album, links and the song itself.
+
+        Every write is a data-modifying CTE of the same statement, so foreign keys are
+        checked once all rows exist and the whole track costs a single round trip.
+        Entities the known-entity cache says are stored unchanged are left out, and
+        the statement is None when nothing needs writing. The statement returns
+        whether the song row was inserted; the returned callback records the written
+        entities in the cache and must only run after the transaction commits.
+        """
+        cache = self.entity_cache
+        album = song.get('album') or {}
+        song_artists = song.get('artists', []) or []
+        album_artists = album.get('artists', []) or []
+
+        artist_lookup: Dict[str, Dict[str, Optional[str]]] = {}
+        for artist in song_artists + album_artists:
+            artist_id = artist.get('id')
+            if not artist_id:
+                continue
+            existing = artist_lookup.get(artist_id) or {}
+            artist_lookup[artist_id] = {
+                'name': artist.get('name') or existing.get('name'),
+                'image_url': artist.get('image_url') or existing.get('image_url')
+            }
+
+        def artist_links(owner_id, artists):
+            links = {}
+            for idx, artist in enumerate(artists):
+                if artist.get('id') and artist['id'] not in links:
+                    links[artist['id']] = (owner_id, artist['id'], idx)
+            return list(links.values())
+
+        ctes: List[str] = []
+        params: List = []
+        written: List[tuple] = []  # cache.remember() arguments for everything in the statement
+
+        artist_rows = [
+            (artist_id, payload['name'], payload['image_url'])
+            for artist_id, payload in artist_lookup.items()
+            if cache.changed('artists', artist_id, (payload['name'],), payload['image_url'])
+        ]
+        if artist_rows:
+            ctes.append(
+                f"""artist_upsert AS (
+                       INSERT INTO artists (id, name, image_url)
+                       VALUES {self._values_clause(artist_rows)}
                        ON CONFLICT (id) DO UPDATE SET
                            name = EXCLUDED.name,
-                           release_date = EXCLUDED.release_date,
-                           image_url = COALESCE(albums.image_url, EXCLUDED.image_url),
-                           updated_at = CURRENT_TIMESTAMP""",
-                    (album['id'], album['name'], release_date, album.get('image_url'))
+                           image_url = COALESCE(artists.image_url, EXCLUDED.image_url),
+                           updated_at = CURRENT_TIMESTAMP
+                       RETURNING 1)"""
+            )
+            params.extend(value for row in artist_rows for value in row)
+            written.extend(('artists', artist_id, (name,), image_url) for artist_id, name, image_url in artist_rows)
+
+        if 'album' in song:
+            release_date = self._parse_release_date(album.get('release_date'))
+            album_links = artist_links(album['id'], album_artists)
+            album_values = (album['name'], release_date)
+            album_artist_ids = [link[1] for link in album_links]
+            if cache.changed('albums', album['id'], album_values, album.get('image_url'), album_artist_ids):
+                ctes.append(
+                    """album_upsert AS (
+                           INSERT INTO albums (id, name, release_date, image_url)
+                           VALUES (%s, %s, %s, %s)
+                           ON CONFLICT (id) DO UPDATE SET
+                               name = EXCLUDED.name,
+                               release_date = EXCLUDED.release_date,
+                               image_url = COALESCE(albums.image_url, EXCLUDED.image_url),
+                               updated_at = CURRENT_TIMESTAMP
+                           RETURNING 1)"""
                 )
+                params.extend((album['id'], album['name'], release_date, album.get('image_url')))
+
+                if album_links:
+                    ctes.append(
+                        f"""album_artist_links AS (
+                               INSERT INTO album_artists (album_id, artist_id, artist_order)
+                               VALUES {self._values_clause(album_links)}
+                               ON CONFLICT (album_id, artist_id) DO NOTHING
+                               RETURNING 1)"""
+                    )
+                    params.extend(value for row in album_links for value in row)
+                written.append(('albums', album['id'], album_values, album.get('image_url'), album_artist_ids))
+
+        song_links = artist_links(song['id'], song_artists)
+        song_values = (
+            song['name'],
+            album.get('id') if 'album' in song else None,
+            song.get('duration_ms', 0),
+            song.get('popularity', 0),
+            song.get('external_links', {})
+        )
+        song_artist_ids = [link[1] for link in song_links]
+        result = "SELECT false"
+        if cache.changed('songs', song['id'], song_values, song.get('image_url'), song_artist_ids):
+            ctes.append(
+                """song_upsert AS (
+                       INSERT INTO songs (id, name, album_id, duration_ms, popularity, external_links, image_url)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s)
+                       ON CONFLICT (id) DO UPDATE SET
+                           name = EXCLUDED.name,
+                           album_id = EXCLUDED.album_id,
+                           duration_ms = EXCLUDED.duration_ms,
+                           popularity = EXCLUDED.popularity,
+                           external_links = EXCLUDED.external_links,
+                           image_url = COALESCE(songs.image_url, EXCLUDED.image_url),
+                           updated_at = CURRENT_TIMESTAMP
+                       RETURNING (xmax = 0) AS inserted)"""
+            )
+            params.extend((song['id'], *song_values[:4], Json(song_values[4]), song.get('image_url')))
+
+            if song_links:
+                ctes.append(
+                    f"""song_artist_links AS (
+                           INSERT INTO song_artists (song_id, artist_id, artist_order)
+                           VALUES {self._values_clause(song_links)}
+                           ON CONFLICT (song_id, artist_id) DO NOTHING
+                           RETURNING 1)"""
+                )
+                params.extend(value for row in song_links for value in row)
+            written.append(('songs', song['id'], song_values, song.get('image_url'), song_artist_ids))
+            result = "SELECT inserted FROM song_upsert"
+
+        def remember():
+            for entry in written:
+                cache.remember(*entry)
+
+        if not ctes:
+            return None, [], remember
+        return "WITH " + ",\n".join(ctes) + "\n" + result, params, remember
+
+    def _known_entities(self) -> KnownEntityCache:
+        """The process-wide entity cache, warmed from Postgres on first use"""
+        if not self.entity_cache.warmed:
+            try:
+                self.pool.run(self.entity_cache.warm)
+                self.logger.info(f"Warmed known-entity cache with {len(self.entity_cache)} entities")
+            except Exception as e:
+                # Without a warm cache every entity counts as changed, which is just the old behaviour
+                self.logger.warning(f"Failed warming known-entity cache: {e}")
+                self.entity_cache.warmed = True
+        return self.entity_cache
+
+    def _run_catalog_write(self, build_and_write: Callable[[Any], T]) -> T:
+        """Run a write built from the entity cache, rebuilding it uncached if the cache was stale.
+
+        A foreign-key violation means an entity the cache vouched for is gone from the
+        database, so the cache is dropped and the write retried with every entity.
+        """
+        self._known_entities()
+        try:
+            return self.pool.run(build_and_write)
+        except psycopg2.errors.ForeignKeyViolation:
+            self.logger.warning("Known-entity cache is stale, clearing it and rewriting the batch")
+            self.entity_cache.clear()
+            return self.pool.run(build_and_write)
+
+    def index_song_if_needed(self, song) -> bool:
+        """Insert or update song with all relationships; returns True if the song is new"""
+        def write(conn):
+            statement, params, remember = self._build_song_upsert(song)
+            if statement is None:
+                return False, remember
+            return bool(self._execute_fetchone(conn, statement, params)[0]), remember
 
-                # Insert album-artist relationships
-                if 'artists' in album:
-                    for idx, artist in enumerate(album['artists']):
-                        cur.execute(
-                            """INSERT INTO album_artists (album_id, artist_id, artist_order) 
-                               VALUES (%s, %s, %s)
-                               ON CONFLICT (album_id, artist_id) DO NOTHING""",
-                            (album['id'], artist['id'], idx)
-                        )
-                self.conn.commit()
+        try:
+            is_new, remember = self._run_catalog_write(write)
         except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error indexing album: {e}")
+            self.logger.error(f"Error indexing song: {e}")
             raise
 
-    def _song_exists(self, song_id):
-        """Check if song exists in database"""
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM songs WHERE id = %s", (song_id,))
-            return cur.fetchone() is not None
+        remember()
+        if is_new:
+            self._log_indexed(song)
+        return is_new
+
+    @staticmethod
+    def _execute_fetchone(conn, statement, params=None):
+        with conn.cursor() as cur:
+            cur.execute(statement, params)
+            return cur.fetchone()
+
+    def _log_indexed(self, song):
+        if 'artists' in song:
+            artist_names = ', '.join([artist['name'] for artist in song['artists']])
+            album_year = (song['album'].get('release_date') or '')[:4] if 'album' in song else ''
+            self.logger.info(f"Indexed: {artist_names} - {song['name']} ({album_year})")
+
+    @staticmethod
+    def _parse_played_at(value):
+        # Note: The timestamp from recognizer is already in local (Israel) time
+        # despite having 'Z' suffix - it uses datetime.now() which is local time
+        return datetime.fromisoformat(value.replace('Z', '').replace('T', ' '))
+
+    def index_play(self, full_record, station=None):
+        """Insert a play record"""
+        played_at = self._parse_played_at(full_record['played_at'])
+
+        def write(conn):
+            with conn.cursor() as cur:
+                station_id = self.station_id
+                if station:
+                    # Get station ID for the specified station
+                    station_id = self._lookup_station_ids(cur, [station]).get(station, station_id)
+
+                # Insert play record (ignore if duplicate)
+                cur.execute(
+                    """INSERT INTO plays (song_id, station_id, played_at)
+                       VALUES (%s, %s, %s)
+                       ON CONFLICT (song_id, station_id, played_at) DO NOTHING""",
+                    (full_record['id'], station_id, played_at)
+                )
 
-    def index_song_if_needed(self, song):
-        """Insert or update song with all relationships"""
         try:
-            with self.conn.cursor() as cur:
-                song_artists = song.get('artists', []) or []
-                album_artists = (song.get('album') or {}).get('artists', []) or []
+            self.pool.run(write)
+        except Exception as e:
+            self.logger.error(f"Error indexing play: {e}")
+            raise
+
+    def index_plays(self, plays: List[Tuple[dict, Optional[str]]]) -> int:
+        """Write a batch of (record, station) plays and their songs in one transaction"""
+        if not plays:
+            return 0
 
-                artist_lookup: Dict[str, Dict[str, Optional[str]]] = {}
+        def write(conn):
+            new_songs = []
+            remembers = []
+            with conn.cursor() as cur:
+                station_ids = self._lookup_station_ids(cur, (station for _, station in plays))
 
-                for artist in song_artists + album_artists:
-                    artist_id = artist.get('id')
-                    if not artist_id:
+                indexed_songs = set()
+                for record, _ in plays:
+                    if record['id'] in indexed_songs:
                         continue
+                    indexed_songs.add(record['id'])
+                    statement, params, remember = self._build_song_upsert(record)
+                    remembers.append(remember)
+                    if statement is None:
+                        continue  # known song, unchanged: the play insert is all that is needed
+                    cur.execute(statement, params)
+                    if cur.fetchone()[0]:
+                        new_songs.append(record)
+
+                execute_values(
+                    cur,
+                    """INSERT INTO plays (song_id, station_id, played_at)
+                       VALUES %s
+                       ON CONFLICT (song_id, station_id, played_at) DO NOTHING""",
+                    [
+                        (record['id'], station_ids.get(station, self.station_id), self._parse_played_at(record['played_at']))
+                        for record, station in plays
+                    ]
+                )
+            return new_songs, remembers
 
-                    existing = artist_lookup.get(artist_id)
-                    image_url = artist.get('image_url') or (existing or {}).get('image_url')
-                    name = artist.get('name') or (existing or {}).get('name')
+        try:
+            new_songs, remembers = self._run_catalog_write(write)
+        except Exception as e:
+            self.logger.error(f"Error indexing {len(plays)} plays: {e}")
+            raise
 
-                    artist_lookup[artist_id] = {
-                        'id': artist_id,
-                        'name': name,
-                        'image_url': image_url
-                    }
+        for remember in remembers:
+            remember()
+        for song in new_songs:
+            self._log_indexed(song)
+        return len(plays)
+
+    def bulk_index_plays(self, plays: List[Tuple[dict, Optional[str]]]) -> int:
+        """Write a batch of (record, station) plays and their catalog entries through COPY.
+
+        Meant for backfills: every entity in the batch is staged and merged in one
+        transaction, skipping the per-song statements and the known-entity cache.
+        """
+        if not plays:
+            return 0
+
+        rows: Dict[str, Dict[tuple, tuple]] = {table: {} for table in LOAD_ORDER}
+
+        def add(table, key, row, merge=False):
+            existing = rows[table].get(key)
+            if existing and merge:
+                # Prefer values already seen, but fill in names and images a later record has
+                row = tuple(old if old is not None else new for old, new in zip(existing, row))
+            rows[table][key] = row
+
+        for record, station in plays:
+            album = record.get('album') or {}
+            for artist in (record.get('artists') or []) + (album.get('artists') or []):
+                if artist.get('id'):
+                    add('artists', artist['id'], (artist['id'], artist.get('name'), artist.get('image_url')), merge=True)
+            if album.get('id'):
+                add('albums', album['id'], (album['id'], album.get('name'), self._parse_release_date(album.get('release_date')), album.get('image_url')))
+                for idx, artist in enumerate(album.get('artists') or []):
+                    if artist.get('id') and (album['id'], artist['id']) not in rows['album_artists']:
+                        add('album_artists', (album['id'], artist['id']), (album['id'], artist['id'], idx))
+            add('songs', record['id'], (
+                record['id'], record['name'], album.get('id'), record.get('duration_ms', 0),
+                record.get('popularity', 0), Json(record.get('external_links', {})), record.get('image_url')
+            ))
+            for idx, artist in enumerate(record.get('artists') or []):
+                if artist.get('id') and (record['id'], artist['id']) not in rows['song_artists']:
+                    add('song_artists', (record['id'], artist['id']), (record['id'], artist['id'], idx))
+
+        columns = {
+            'artists': ('id', 'name', 'image_url'),
+            'albums': ('id', 'name', 'release_date', 'image_url'),
+            'album_artists': ('album_id', 'artist_id', 'artist_order'),
+            'songs': ('id', 'name', 'album_id', 'duration_ms', 'popularity', 'external_links', 'image_url'),
+            'song_artists': ('song_id', 'artist_id', 'artist_order'),
+            'plays': ('song_id', 'station_id', 'played_at'),
+        }
+
+        def write(conn):
+            with conn.cursor() as cur:
+                station_ids = self._lookup_station_ids(cur, (station for _, station in plays))
+            for record, station in plays:
+                play = (record['id'], station_ids.get(station, self.station_id), self._parse_played_at(record['played_at']))
+                rows['plays'][play] = play
+
+            loader = BulkLoader(conn)
+            for table in LOAD_ORDER:
+                if rows[table]:
+                    loader.load(table, columns[table], rows[table].values())
 
-                if artist_lookup:
-                    self.index_artists(list(artist_lookup.values()))
+        try:
+            self.pool.run(write)
+        except Exception as e:
+            self.logger.error(f"Error bulk indexing {len(plays)} plays: {e}")
+            raise
+        # Entities were written behind the cache's back
+        self.entity_cache.clear()
+        return len(plays)
 
-                if 'album' in song:
-                    self.index_album(song['album'])
+    def _ensure_resolution_cache_table(self):
+        """Create the Shazam -> Spotify resolution cache table on first use"""
+        if getattr(self, '_resolution_cache_ready', False):
+            return
 
-                was_existing = self._song_exists(song['id'])
+        def create(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    """CREATE TABLE IF NOT EXISTS spotify_resolution_cache (
+                           cache_key VARCHAR(1000) PRIMARY KEY,
+                           spotify_track JSONB,
+                           found BOOLEAN NOT NULL,
+                           resolved_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
+                       )"""
+                )
 
-                # Convert external_links to JSON
-                external_links = Json(song.get('external_links', {}))
+        self.pool.run(create)
+        self._resolution_cache_ready = True
 
-                # Insert or update song
-                cur.execute(
-                    """INSERT INTO songs (id, name, album_id, duration_ms, popularity, external_links, image_url) 
-                       VALUES (%s, %s, %s, %s, %s, %s, %s)
-                       ON CONFLICT (id) DO UPDATE SET
-                           name = EXCLUDED.name,
-                           album_id = EXCLUDED.album_id,
-                           duration_ms = EXCLUDED.duration_ms,
-                           popularity = EXCLUDED.popularity,
-                           external_links = EXCLUDED.external_links,
-                           image_url = COALESCE(songs.image_url, EXCLUDED.image_url),
-                           updated_at = CURRENT_TIMESTAMP""",
-                    (
-                        song['id'],
-                        song['name'],
-                        song['album']['id'] if 'album' in song else None,
-                        song.get('duration_ms', 0),
-                        song.get('popularity', 0),
-                        external_links,
-                        song.get('image_url')
+    def get_cached_resolutions(self, cache_keys: List[str]) -> Dict[str, Tuple[Optional[dict], bool, float]]:
+        """Return cached Spotify resolutions as (track, found, age in seconds) keyed by cache key"""
+        if not cache_keys:
+            return {}
+
+        try:
+            self._ensure_resolution_cache_table()
+
+            def read(conn):
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """SELECT cache_key, spotify_track, found,
+                                  EXTRACT(EPOCH FROM (LOCALTIMESTAMP - resolved_at))
+                           FROM spotify_resolution_cache WHERE cache_key = ANY(%s)""",
+                        (cache_keys,)
                     )
+                    return cur.fetchall()
+
+            rows = self.pool.run(read)
+            return {key: (track, found, float(age)) for key, track, found, age in rows}
+        except Exception as e:
+            self.logger.error(f"Error reading resolution cache: {e}")
+            raise
+
+    def store_resolution(self, cache_keys: List[str], spotify_track: Optional[dict]):
+        """Store a Spotify resolution (or a confirmed miss) under every cache key"""
+        if not cache_keys:
+            return
+
+        try:
+            self._ensure_resolution_cache_table()
+
+            def write(conn):
+                with conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        """INSERT INTO spotify_resolution_cache (cache_key, spotify_track, found)
+                           VALUES %s
+                           ON CONFLICT (cache_key) DO UPDATE SET
+                               spotify_track = EXCLUDED.spotify_track,
+                               found = EXCLUDED.found,
+                               resolved_at = LOCALTIMESTAMP""",
+                        [(key, Json(spotify_track) if spotify_track else None, spotify_track is not None) for key in cache_keys]
+                    )
+
+            self.pool.run(write)
+        except Exception as e:
+            self.logger.error(f"Error storing resolution cache: {e}")
+            raise
+
+    def _ensure_station_state_table(self):
+        """Create the shared worker station state table on first use"""
+        if getattr(self, '_station_state_ready', False):
+            return
+
+        def create(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    """CREATE TABLE IF NOT EXISTS station_state (
+                           station_name VARCHAR(100) PRIMARY KEY,
+                           state JSONB NOT NULL,
+                           updated_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
+                       )"""
                 )
 
-                # Insert song-artist relationships
-                if 'artists' in song:
-                    for idx, artist in enumerate(song['artists']):
-                        cur.execute(
-                            """INSERT INTO song_artists (song_id, artist_id, artist_order) 
-                               VALUES (%s, %s, %s)
-                               ON CONFLICT (song_id, artist_id) DO NOTHING""",
-                            (song['id'], artist['id'], idx)
-                        )
-
-                if not was_existing and 'artists' in song:
-                    artist_names = ', '.join([artist['name'] for artist in song['artists']])
-                    album_year = song['album'].get('release_date', '')[:4] if 'album' in song else ''
-                    self.logger.info(f"Indexed: {artist_names} - {song['name']} ({album_year})")
-
-                self.conn.commit()
+        self.pool.run(create)
+        self._station_state_ready = True
+
+    def get_station_states(self) -> Dict[str, Dict[str, Any]]:
+        """Return the stored worker state of every station, keyed by station name"""
+        try:
+            self._ensure_station_state_table()
+
+            def read(conn):
+                with conn.cursor() as cur:
+                    cur.execute("SELECT station_name, state FROM station_state")
+                    return cur.fetchall()
+
+            return {name: state for name, state in self.pool.run(read)}
         except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error indexing song: {e}")
+            self.logger.error(f"Error reading station state: {e}")
             raise
 
-    def index_play(self, full_record, station=None):
-        """Insert a play record"""
+    def store_station_states(self, states: Dict[str, Dict[str, Any]]):
+        """Upsert the worker state of the given stations in one statement"""
+        if not states:
+            return
+
         try:
-            station_id = self.station_id
-            if station:
-                # Get station ID for the specified station
-                with self.conn.cursor() as cur:
-                    cur.execute("SELECT id FROM stations WHERE name = %s", (station,))
-                    result = cur.fetchone()
-                    if result:
-                        station_id = result[0]
-
-            with self.conn.cursor() as cur:
-                # Parse played_at timestamp
-                # Note: The timestamp from recognizer is already in local (Israel) time
-                # despite having 'Z' suffix - it uses datetime.now() which is local time
-                played_at_str = full_record['played_at'].replace('Z', '').replace('T', ' ')
-                played_at = datetime.fromisoformat(played_at_str)
+            self._ensure_station_state_table()
+
+            def write(conn):
+                with conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        """INSERT INTO station_state (station_name, state)
+                           VALUES %s
+                           ON CONFLICT (station_name) DO UPDATE SET
+                               state = EXCLUDED.state,
+                               updated_at = LOCALTIMESTAMP""",
+                        [(name, Json(state)) for name, state in states.items()]
+                    )
 
-                # Insert play record (ignore if duplicate)
+            self.pool.run(write)
+        except Exception as e:
+            self.logger.error(f"Error storing station state: {e}")
+            raise
+
+    def _ensure_ingested_files_table(self):
+        """Create the processed-file ledger on first use"""
+        if getattr(self, '_ingested_files_ready', False):
+            return
+
+        def create(conn):
+            with conn.cursor() as cur:
                 cur.execute(
-                    """INSERT INTO plays (song_id, station_id, played_at) 
-                       VALUES (%s, %s, %s)
-                       ON CONFLICT (song_id, station_id, played_at) DO NOTHING""",
-                    (full_record['id'], station_id, played_at)
+                    """CREATE TABLE IF NOT EXISTS ingested_files (
+                           path TEXT PRIMARY KEY,
+                           size BIGINT NOT NULL,
+                           mtime_ns BIGINT NOT NULL,
+                           content_hash BYTEA NOT NULL,
+                           plays INTEGER NOT NULL,
+                           ingested_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
+                       )"""
                 )
-                self.conn.commit()
+
+        self.pool.run(create)
+        self._ingested_files_ready = True
+
+    def get_ingested_files(self, paths: List[str]) -> Dict[str, Tuple[int, int, bytes]]:
+        """Return the ledger entries (size, mtime_ns, content hash) of the given paths"""
+        if not paths:
+            return {}
+
+        try:
+            self._ensure_ingested_files_table()
+
+            def read(conn):
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT path, size, mtime_ns, content_hash FROM ingested_files WHERE path = ANY(%s)",
+                        (paths,)
+                    )
+                    return cur.fetchall()
+
+            return {path: (size, mtime_ns, bytes(content_hash)) for path, size, mtime_ns, content_hash in self.pool.run(read)}
         except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error indexing play: {e}")
+            self.logger.error(f"Error reading ingested files ledger: {e}")
+            raise
+
+    def record_ingested_file(self, path: str, size: int, mtime_ns: int, content_hash: bytes, plays: int):
+        """Record a fully ingested file so rescans skip it while it is unchanged"""
+        try:
+            self._ensure_ingested_files_table()
+
+            def write(conn):
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """INSERT INTO ingested_files (path, size, mtime_ns, content_hash, plays)
+                           VALUES (%s, %s, %s, %s, %s)
+                           ON CONFLICT (path) DO UPDATE SET
+                               size = EXCLUDED.size,
+                               mtime_ns = EXCLUDED.mtime_ns,
+                               content_hash = EXCLUDED.content_hash,
+                               plays = EXCLUDED.plays,
+                               ingested_at = LOCALTIMESTAMP""",
+                        (path, size, mtime_ns, psycopg2.Binary(content_hash), plays)
+                    )
+
+            self.pool.run(write)
+        except Exception as e:
+            self.logger.error(f"Error recording ingested file {path}: {e}")
             raise
 
-    def mark_as_archived(self, file_path):
-        """Mark a file as archived by adding 'archived': true."""
+    def touch_ingested_file(self, path: str, size: int, mtime_ns: int):
+        """Refresh the stat of a ledger entry whose content is unchanged, keeping its play count"""
         try:
-            with open(file_path, 'r+', encoding='utf-8') as file:
-                data = json.load(file)
-            data['archived'] = True
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(data, file, ensure_ascii=False, indent=4)
+            self._ensure_ingested_files_table()
+
+            def write(conn):
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "UPDATE ingested_files SET size = %s, mtime_ns = %s WHERE path = %s",
+                        (size, mtime_ns, path)
+                    )
+
+            self.pool.run(write)
         except Exception as e:
-            self.logger.exception(f"Failed to mark file as archived: {e}")
+            self.logger.error(f"Error updating ingested file {path}: {e}")
+            raise
 
     def update_station(self, file_name):
         """Update current station based on filename"""
-        station_names = Helper.get_station_names()
-        station_name = next((s for s in station_names if s in file_name), self.station_name)
+        station_name = self._station_for_file(file_name, Helper.get_station_names(), self.station_name)
         if station_name != self.station_name:
             self.station_name = station_name
-            self.station_id = self._get_or_create_station(station_name)
-
-    def process_file(self, file_path):
-        """Process a JSON file and save data to PostgreSQL"""
-        import os
-        self.update_station(os.path.basename(file_path))
-        
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            if data.get('archived', False):
-                return
-            
-            self.logger.info(f"Processing {file_path} into PostgreSQL database...")
-            for record in data['tracks']:
-                song_data = record.copy()
-                song_data.pop('played_at', None)
-                self.index_song_if_needed(song_data)
-                self.index_play(record)
-        
-        self.mark_as_archived(file_path)
-
-    def cleanup_file(self, file_path):
-        """Deletes a data file if it holds no data"""
-        import os
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                should_delete = not data.get('tracks')
-        except Exception as e:
-            return False
-        
-        if should_delete:
-            os.remove(file_path)
+            self.station_id = self._station_ids.get(station_name) or self._get_or_create_station(station_name)
+
+    @staticmethod
+    def _station_for_file(file_name, station_names, default):
+        return next((s for s in station_names if s in file_name), default)
+
+    def process_file(self, file_path, batch_size=DEFAULT_INGEST_BATCH_SIZE, known=None, copy=False):
+        """Ingest a JSON file into PostgreSQL unless the ledger shows it was already ingested.
+
+        The file is streamed once and never modified; plays are written in
+        batches while it is still being parsed. A file already in the ledger
+        whose size or mtime changed is the exception: its plays are held until
+        the content hash is known, so a touched but identical file is skipped
+        without a second read. Empty files are deleted, and anything else is
+        recorded in the ledger under its size, mtime and content hash. With
+        `copy`, batches go through the COPY bulk loader. Returns 'unchanged',
+        'deleted' or 'ingested' and the number of plays written.
+        """
+        path = os.path.abspath(file_path)
+        if known is None:
+            known = self.get_ingested_files([path]).get(path)
+        stat = os.stat(path)
+        if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return 'unchanged', 0
+
+        hold = known is not None
+        write_plays = self.bulk_index_plays if copy else self.index_plays
+        written = 0
+        found_tracks = False
+        batch = []
+        with TrackFileReader(path) as reader:
+            if reader.archived:  # files archived by the old in-place marking are already stored
+                found_tracks = True
+            else:
+                self.update_station(os.path.basename(path))
+                for record in reader.tracks():
+                    if not found_tracks:
+                        found_tracks = True
+                        self.logger.info(f"Processing {file_path} into PostgreSQL database...")
+                    batch.append((record, self.station_name))
+                    if not hold and len(batch) >= batch_size:
+                        written += write_plays(batch)
+                        batch = []
+            content_hash = reader.digest()
+
+        if hold and known[2] == content_hash:
+            self.touch_ingested_file(path, stat.st_size, stat.st_mtime_ns)
+            return 'unchanged', 0
+        for start in range(0, len(batch), batch_size):
+            written += write_plays(batch[start:start + batch_size])
+
+        if not found_tracks:
+            os.remove(path)
             self.logger.info(f'Deleted empty file {file_path}')
-            return True
-        return False
-
-    def process_files(self, folder_path='.\\simple'):
-        """Process all JSON files in a folder"""
-        import os
+            return 'deleted', 0
+
+        self.record_ingested_file(path, stat.st_size, stat.st_mtime_ns, content_hash, written)
+        return 'ingested', written
+
+    def ingest_files(self, file_paths, batch_size=DEFAULT_INGEST_BATCH_SIZE, ledger=None, copy=False) -> IngestStats:
+        """Process files one after another; a failing file is logged and left out of the ledger"""
+        stats = IngestStats()
+        if ledger is None:
+            ledger = self.get_ingested_files([os.path.abspath(path) for path in file_paths])
+        for file_path in file_paths:
+            try:
+                outcome, plays = self.process_file(file_path, batch_size, ledger.get(os.path.abspath(file_path)), copy)
+            except Exception as e:
+                stats.failed += 1
+                self.logger.exception(f"Failed processing {file_path}: {e}")
+                continue
+            if outcome == 'deleted':
+                stats.deleted += 1
+            elif outcome == 'unchanged':
+                stats.skipped += 1
+            else:
+                stats.files += 1
+                stats.plays += plays
+        return stats
+
+    def process_files(self, folder_path='.\\simple', workers=1, batch_size=DEFAULT_INGEST_BATCH_SIZE, copy=False):
+        """Process all JSON files in a folder, sharded across `workers` processes.
+
+        Files are ordered by station and handed out in runs of consecutive files
+        of one station, so each process keeps hitting the same station id and
+        catalog entries. Every process writes on its own pooled connection.
+        """
         from tqdm import tqdm
-        
-        files_to_process = [f for f in os.listdir(folder_path) if f.endswith('.json')]
-        total_files = len(files_to_process)
-        
-        for i, filename in tqdm(enumerate(files_to_process), total=total_files, desc="Processing Files"):
-            file_path = os.path.join(folder_path, filename)
-            if not self.cleanup_file(file_path):
-                self.process_file(file_path)
+
+        station_names = Helper.get_station_names()
+        started = time.perf_counter()
+        stats = IngestStats()
+        file_paths = []
+        with os.scandir(folder_path) as entries:
+            candidates = [entry for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+        ledger = self.get_ingested_files([os.path.abspath(entry.path) for entry in candidates])
+        for entry in candidates:
+            known = ledger.get(os.path.abspath(entry.path))
+            stat = entry.stat()
+            if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                stats.skipped += 1  # unchanged since it was ingested; not even opened
+            else:
+                file_paths.append(entry.path)
+        file_paths.sort(
+            key=lambda path: (self._station_for_file(os.path.basename(path), station_names, self.station_name), path)
+        )
+
+        with tqdm(total=len(file_paths), desc="Processing Files") as progress:
+            if workers <= 1:
+                for file_path in file_paths:
+                    stats.add(self.ingest_files([file_path], batch_size, ledger, copy))
+                    progress.update(1)
+            else:
+                shards = self._shard_by_station(file_paths, station_names, workers)
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                    futures = {executor.submit(_ingest_shard, shard, batch_size, copy): len(shard) for shard in shards}
+                    for future in as_completed(futures):
+                        stats.add(future.result())
+                        progress.update(futures[future])
+
+        elapsed = time.perf_counter() - started
+        self.logger.info(
+            f"Ingested {stats.plays} plays from {stats.files} files in {elapsed:.1f}s "
+            f"({stats.plays / elapsed if elapsed else 0:.0f} plays/s, {workers} workers; "
+            f"unchanged: {stats.skipped}, deleted empty: {stats.deleted}, failed: {stats.failed})"
+        )
+        return stats
+
+    def _shard_by_station(self, file_paths, station_names, workers):
+        """Splits station-ordered files into runs that never mix stations"""
+        shard_size = max(1, min(self.MAX_INGEST_SHARD_FILES, -(-len(file_paths) // (workers * 4))))
+        shards = []
+        for _, group in groupby(
+            file_paths,
+            key=lambda path: self._station_for_file(os.path.basename(path), station_names, self.station_name)
+        ):
+            group = list(group)
+            shards.extend(group[i:i + shard_size] for i in range(0, len(group), shard_size))
+        return shards
 
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
-            self.logger.info("Closed PostgreSQL connection")
-
-    def __del__(self):
-        """Destructor to ensure connection is closed"""
-        self.close()
+        """Connections go back to the pool after every call; the pool itself is closed by its owner"""
+        return
+
+
+_ingest_connector: Optional[PostgresConnector] = None
+
+
+def _ingest_shard(file_paths: List[str], batch_size: int, copy: bool) -> IngestStats:
+    """Worker process entry point; each process keeps one connector (and pool) across shards"""
+    global _ingest_connector
+    if _ingest_connector is None:
+        _ingest_connector = PostgresConnector()
+    return _ingest_connector.ingest_files(file_paths, batch_size, copy=copy)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill simplified track files into Postgres.")
+    parser.add_argument("folder", nargs="?", default=os.path.join('.', 'simple'), help="Folder of simplified JSON files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel ingestion processes")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_INGEST_BATCH_SIZE, help="Plays written per transaction")
+    parser.add_argument("--copy", action="store_true", help="Write batches with the COPY bulk loader")
+    args = parser.parse_args()
+
+    connector = PostgresConnector()
+    stats = connector.process_files(args.folder, workers=args.workers, batch_size=args.batch_size, copy=args.copy)
+    print(f"Ingested {stats.plays} plays from {stats.files} files (unchanged: {stats.skipped}, deleted empty: {stats.deleted}, failed: {stats.failed})")
@@ -0,0 +1,247 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import psycopg2
+import psycopg2.pool
+
+from helper import Helper
+
+T = TypeVar('T')
+
+
+class PostgresPool:
+    """Thread-safe pool of psycopg2 connections that survives database restarts.
+
+    Idle connections are health-checked before they are handed out, broken ones
+    are replaced, and new connections are opened with exponential backoff. Every
+    connection gets a statement timeout so a stuck query cannot hold a caller
+    forever. `run()` retries a unit of work on connection errors, which is safe
+    for the idempotent upserts the workers issue. Other operational errors, such
+    as a statement hitting that timeout, are not retried.
+    """
+
+    DEFAULT_MAX_SIZE = 10
+    DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+    CONNECT_TIMEOUT_SECONDS = 10
+    CONNECT_ATTEMPTS = 5
+    RETRY_BACKOFF = (0.5, 30)  # (initial, max) seconds
+    HEALTH_CHECK_IDLE_SECONDS = 30
+    TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+    # SQLSTATEs of an OperationalError that mean the connection, not the statement, failed
+    CONNECTION_ERROR_CODES = ('57P01', '57P02', '57P03')  # admin/crash shutdown, cannot connect now
+
+    _shared: Optional['PostgresPool'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        connect_kwargs: Dict[str, Any],
+        max_size: int = DEFAULT_MAX_SIZE,
+        statement_timeout_ms: int = DEFAULT_STATEMENT_TIMEOUT_MS,
+        logger=None
+    ):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max(1, max_size)
+        self.statement_timeout_ms = statement_timeout_ms
+        self.logger = logger
+        self.pid = os.getpid()
+        self._idle: List[Tuple[Any, float]] = []  # (connection, returned at)
+        self._size = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    @classmethod
+    def from_config(cls, logger=None) -> 'PostgresPool':
+        config = Helper.load_config().get('postgres', {})
+        return cls(
+            {
+                'host': config.get('host', 'localhost'),
+                'port': config.get('port', 5432),
+                'database': config.get('database', 'radio_plays'),
+                'user': config.get('user', 'postgres'),
+                'password': config.get('password', 'postgres'),
+            },
+            max_size=int(config.get('pool_size', cls.DEFAULT_MAX_SIZE)),
+            statement_timeout_ms=int(config.get('statement_timeout_ms', cls.DEFAULT_STATEMENT_TIMEOUT_MS)),
+            logger=logger
+        )
+
+    @classmethod
+    def shared(cls, logger=None) -> 'PostgresPool':
+        """Process-wide pool; a forked child gets its own instead of inheriting the parent's sockets."""
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared.pid != os.getpid() or cls._shared._closed:
+                cls._shared = cls.from_config(logger)
+            return cls._shared
+
+    @classmethod
+    def close_shared(cls) -> None:
+        with cls._shared_lock:
+            if cls._shared is not None and cls._shared.pid == os.getpid():
+                cls._shared.close()
+            cls._shared = None
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Borrows a connection for one transaction: commits on success, rolls back on error."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except self.TRANSIENT_ERRORS:
+                    pass
+            raise
+        finally:
+            self.putconn(conn)
+
+    def run(self, work: Callable[[Any], T], retries: int = 3) -> T:
+        """Runs `work(conn)` in a transaction, retrying on a fresh connection if the old one broke."""
+        attempt = 0
+        while True:
+            try:
+                with self.connection() as conn:
+                    return work(conn)
+            except self.TRANSIENT_ERRORS as exc:
+                if attempt >= retries or not self.is_connection_error(exc):
+                    raise
+                delay = self._backoff_delay(attempt)
+                if self.logger:
+                    self.logger.warning(f"PostgreSQL connection error, retrying in {delay:.1f}s: {exc}")
+                time.sleep(delay)
+                attempt += 1
+
+    @classmethod
+    def is_connection_error(cls, exc: BaseException) -> bool:
+        """Whether `exc` means the connection was lost, so the work may be retried on a new one."""
+        if isinstance(exc, psycopg2.InterfaceError):
+            return True
+        if not isinstance(exc, psycopg2.OperationalError):
+            return False
+        if exc.pgcode is None:
+            # Client-side failures (server closed the connection, network errors) carry no SQLSTATE
+            return type(exc) is psycopg2.OperationalError
+        return exc.pgcode.startswith('08') or exc.pgcode in cls.CONNECTION_ERROR_CODES
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn, returned_at = None, None
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise psycopg2.pool.PoolError("timed out waiting for a PostgreSQL connection")
+                    self._available.wait(remaining)
+                    continue
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_healthy(conn, returned_at):
+                return conn
+            self._discard(conn)
+            with self._available:
+                self._size += 1  # reuse the slot for a replacement connection
+            try:
+                return self._connect()
+            except Exception:
+                self._release_slot()
+                raise
+
+    def putconn(self, conn: Any) -> None:
+        if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()  # a caller left a read-only transaction open
+            except self.TRANSIENT_ERRORS:
+                pass
+        if conn.closed or conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            self._discard(conn)
+            return
+        with self._available:
+            if self._closed:
+                conn.close()
+                self._size -= 1
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._available.notify()
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            for conn, _ in self._idle:
+                conn.close()
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+
+    def _connect(self) -> Any:
+        options = f'-c timezone=Asia/Jerusalem -c statement_timeout={self.statement_timeout_ms}'  # Set session timezone to Israel
+        for attempt in range(self.CONNECT_ATTEMPTS):
+            try:
+                conn = psycopg2.connect(
+                    **self.connect_kwargs,
+                    options=options,
+                    connect_timeout=self.CONNECT_TIMEOUT_SECONDS,
+                    keepalives=1,
+                    keepalives_idle=30
+                )
+                conn.autocommit = False
+                if self.logger:
+                    self.logger.info("Connected to PostgreSQL database")
+                return conn
+            except psycopg2.OperationalError as exc:
+                if attempt == self.CONNECT_ATTEMPTS - 1:
+                    if self.logger:
+                        self.logger.error(f"Failed to connect to PostgreSQL: {exc}")
+                    raise
+                delay = self._backoff_delay(attempt)
+                if self.logger:
+                    self.logger.warning(f"PostgreSQL unavailable, reconnecting in {delay:.1f}s: {exc}")
+                time.sleep(delay)
+
+    def _is_healthy(self, conn: Any, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.HEALTH_CHECK_IDLE_SECONDS:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except self.TRANSIENT_ERRORS:
+            return False
+
+    def _discard(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._available:
+            self._size -= 1
+            self._available.notify()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        initial, maximum = self.RETRY_BACKOFF
+        delay = min(initial * (2 ** attempt), maximum)
+        return delay * random.uniform(0.5, 1.0)
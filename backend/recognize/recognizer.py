@@ -1,14 +1,25 @@
 from typing import Any, Dict, List, Optional, Tuple, Protocol, Set
 from pydub import AudioSegment
-import os, sys, requests, time, base64, json
+import os, sys, io, re, requests, time, base64, json, random, threading
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone, timedelta
 import asyncio
+import aiohttp
+import numpy as np
+from collections import OrderedDict
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from pathlib import Path
 #sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from helper import Helper
+from audio_stream import StationStreamReader
+import audio_frames
+import audio_analysis
+from audio_analysis import AudioJobPool, Fingerprint
 from postgres_connector import PostgresConnector
+from postgres_pool import PostgresPool
+from play_spool import PlayWriter
+from station_state import FileStationStateStore, PostgresStationStateStore, StationStateStore
 from shazamio import Shazam
 
 # Timezone handling with fallback
@@ -26,13 +37,34 @@ class StationConfig:
     last_song_recorded: Optional[str] = None
     live_intro: Optional[int] = None
 
+@dataclass
+class StationOutcome:
+    name: str
+    status: str  # 'ok', 'timeout' or 'error'
+    elapsed: float
+
+@dataclass
+class CycleStats:
+    outcomes: List[StationOutcome]
+    elapsed: float
+    concurrency: int
+
+    def count(self, status: str) -> int:
+        return sum(1 for outcome in self.outcomes if outcome.status == status)
+
+    @property
+    def slowest(self) -> Optional[StationOutcome]:
+        return max(self.outcomes, key=lambda outcome: outcome.elapsed, default=None)
+
 class ConfigManager:
     TOKEN_KEY = 'access_token'
     LAST_SONG_KEY = 'last_song_recorded'
     LIVE_INTRO_KEY = "live_intro"
+    DEFAULT_STATE_FLUSH_SECONDS = 2.0
     
     def __init__(self):
         self.config = Helper.load_config()
+        self.worker_config = self.config.get('worker') or {}
         spotify_config = self.config.get('spotify', {})
         self.client_id = spotify_config.get('client_id')
         self.client_secret = spotify_config.get('client_secret')
@@ -41,7 +73,14 @@ class ConfigManager:
             raise ValueError("Spotify client credentials are not configured")
 
         self.state_path = self._resolve_state_path()
+        self.state_store = self._create_state_store()
         self.station_state = self._load_state()
+        self._unsubscribe_config = Helper.subscribe_config(self._on_config_change)
+
+    def _on_config_change(self, config: Dict[str, Any]) -> None:
+        """Picks up station edits from the config file; credentials and worker tuning need a restart."""
+        self.config = config
+        self.worker_config = config.get('worker') or {}
     
     def get_stations(self) -> List[StationConfig]:
         stations_config = self.config.get('stations') or []
@@ -83,7 +122,12 @@ class ConfigManager:
 
         stations_state = self.station_state.setdefault('stations', {})
         stations_state[station_name] = {self.LAST_SONG_KEY: song_id}
-        self._save_state()
+        self.state_store.update(station_name, stations_state[station_name])
+
+    def close(self) -> None:
+        """Writes out state changes that are still waiting for a coalesced flush."""
+        self._unsubscribe_config()
+        self.state_store.close()
 
     def _resolve_state_path(self) -> str:
         explicit_path = os.getenv('WORKER_STATE_PATH')
@@ -98,6 +142,20 @@ class ConfigManager:
         base_dir = os.path.dirname(os.path.abspath(__file__))
         return os.path.join(base_dir, 'station_state.json')
 
+    def _create_state_store(self) -> StationStateStore:
+        try:
+            flush_seconds = max(0.0, float(self.worker_config.get('state_flush_seconds', self.DEFAULT_STATE_FLUSH_SECONDS)))
+        except (TypeError, ValueError):
+            flush_seconds = self.DEFAULT_STATE_FLUSH_SECONDS
+        logger = Helper.get_rotating_logger('RadioPlaysFetch', log_file='radio_plays_fetch.log', station_info=True)
+
+        backend = str(self.worker_config.get('state_backend') or 'file').lower()
+        if backend == 'postgres':
+            return PostgresStationStateStore(PostgresConnector(), flush_seconds, logger)
+        if backend != 'file':
+            raise ValueError(f"Unknown worker state_backend '{backend}' (expected 'file' or 'postgres')")
+        return FileStationStateStore(self.state_path, flush_seconds, logger)
+
     def _default_state(self) -> Dict[str, Dict[str, Dict[str, Optional[str]]]]:
         stations_config = self.config.get('stations') or []
         return {
@@ -110,14 +168,8 @@ class ConfigManager:
 
     def _load_state(self) -> Dict[str, Dict[str, Dict[str, Optional[str]]]]:
         default_state = self._default_state()
-        try:
-            with open(self.state_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-            if not isinstance(data, dict):
-                return default_state
-        except FileNotFoundError:
-            return default_state
-        except json.JSONDecodeError:
+        data = self.state_store.load()
+        if data is None:
             return default_state
 
         stations_section = data.get('stations', {})
@@ -138,35 +190,46 @@ class ConfigManager:
         data['stations'] = normalized
         return data
 
-    def _save_state(self) -> None:
-        directory = os.path.dirname(self.state_path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-
-        with open(self.state_path, 'w', encoding='utf-8') as file:
-            json.dump(self.station_state, file, ensure_ascii=False, indent=2)
-
 class SpotifyClient:
     DEFAULT_TIMEOUT = (5, 10)  # (connect, read)
+    API_URL = "https://api.spotify.com/v1"
+    TOKEN_URL = "https://accounts.spotify.com/api/token"
+    TOKEN_REFRESH_MARGIN_SECONDS = 60
+    MAX_RETRIES = 3
+    BACKOFF_BASE_SECONDS = 0.5
+    MAX_RETRY_AFTER_SECONDS = 30
+    POOL_SIZE = 10
 
     def __init__(self, client_id: str, client_secret: str, request_timeout: Tuple[int, int] = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
         self._timeout = request_timeout or self.DEFAULT_TIMEOUT
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=self.POOL_SIZE))
     
-    def get_token(self) -> str:
-        if not self._token or not self._is_token_valid():
-            self._token = self._request_new_token()
-        return self._token
+    def get_token(self, stale_token: Optional[str] = None) -> str:
+        """Returns a cached token, refreshing it shortly before `expires_in` runs out.
+
+        Passing the token a request was rejected with forces a refresh, unless
+        another thread already replaced it.
+        """
+        with self._token_lock:
+            expiring = time.monotonic() >= self._token_expires_at - self.TOKEN_REFRESH_MARGIN_SECONDS
+            if not self._token or expiring or (stale_token and stale_token == self._token):
+                self._token, expires_in = self._request_new_token()
+                self._token_expires_at = time.monotonic() + expires_in
+            return self._token
     
-    def _request_new_token(self) -> str:
+    def _request_new_token(self) -> Tuple[str, int]:
         client_credentials = f"{self.client_id}:{self.client_secret}"
         client_credentials_b64 = base64.b64encode(client_credentials.encode()).decode()
         
         try:
-            response = requests.post(
-                "https://accounts.spotify.com/api/token",
+            response = self._session.post(
+                self.TOKEN_URL,
                 headers={'Authorization': f'Basic {client_credentials_b64}'},
                 data={'grant_type': 'client_credentials'},
                 timeout=self._timeout
@@ -177,22 +240,55 @@ class SpotifyClient:
         if response.status_code != 200:
             raise Exception(f'Error getting access token: {response.status_code}, {response.text}')
         
-        return response.json()['access_token']
-    
-    def _is_token_valid(self) -> bool:
-        if not self._token:
-            return False
-            
+        payload = response.json()
+        return payload['access_token'], int(payload.get('expires_in') or 3600)
+
+    def _api_get(self, path: str, params: Dict[str, Any]) -> requests.Response:
+        """GETs a Web API endpoint over the pooled session.
+
+        401s refresh the token, 429s wait for Retry-After, and connection errors
+        and 5xx responses back off with jitter before retrying.
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            token = self.get_token()
+            final_attempt = attempt == self.MAX_RETRIES
+            try:
+                response = self._session.get(
+                    f"{self.API_URL}{path}",
+                    headers={'Authorization': f'Bearer {token}'},
+                    params=params,
+                    timeout=self._timeout
+                )
+            except requests.exceptions.RequestException:
+                if final_attempt:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                continue
+
+            if final_attempt:
+                return response
+            if response.status_code == 401:
+                self.get_token(stale_token=token)
+            elif response.status_code == 429:
+                time.sleep(self._retry_after(response, attempt))
+            elif response.status_code >= 500:
+                time.sleep(self._backoff_delay(attempt))
+            else:
+                return response
+        return response
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return self.BACKOFF_BASE_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _retry_after(self, response: requests.Response, attempt: int) -> float:
+        return self._retry_after_seconds(response.headers.get('Retry-After', ''), attempt)
+
+    def _retry_after_seconds(self, header_value: str, attempt: int) -> float:
         try:
-            response = requests.get(
-                "https://api.spotify.com/v1/search",
-                headers={'Authorization': f'Bearer {self._token}'},
-                params={'q': 'test', 'type': 'track', 'limit': 1},
-                timeout=self._timeout
-            )
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
-            return False
+            delay = float(header_value)
+        except ValueError:
+            delay = self._backoff_delay(attempt)
+        return min(max(delay, 0.0), self.MAX_RETRY_AFTER_SECONDS) + random.uniform(0, 0.5)
 
     def get_artist_images(self, artist_ids: List[str]) -> Dict[str, Optional[str]]:
         """Fetch primary image URLs for the supplied Spotify artist IDs."""
@@ -210,12 +306,7 @@ class SpotifyClient:
         for start in range(0, len(unique_ids), 50):  # Spotify caps at 50 IDs per request
             chunk = unique_ids[start:start + 50]
             try:
-                response = requests.get(
-                    "https://api.spotify.com/v1/artists",
-                    headers={'Authorization': f'Bearer {self.get_token()}'},
-                    params={'ids': ','.join(chunk)},
-                    timeout=self._timeout
-                )
+                response = self._api_get('/artists', {'ids': ','.join(chunk)})
                 response.raise_for_status()
             except requests.exceptions.RequestException as exc:
                 raise ConnectionError(f"Error fetching artist metadata from Spotify: {exc}") from exc
@@ -252,12 +343,7 @@ class SpotifyClient:
     
     def _search_request(self, query: str) -> Optional[Dict[str, Any]]:
         try:
-            response = requests.get(
-                "https://api.spotify.com/v1/search",
-                headers={'Authorization': f'Bearer {self.get_token()}'},
-                params={'q': query, 'type': 'track', 'limit': 1},
-                timeout=self._timeout
-            )
+            response = self._api_get('/search', {'q': query, 'type': 'track', 'limit': 1})
             response.raise_for_status()
             
             search_results = response.json()
@@ -266,68 +352,606 @@ class SpotifyClient:
         except requests.exceptions.RequestException as e:
             raise ConnectionError(f"Error searching Spotify: {str(e)}")
 
+class AsyncSpotifyClient(SpotifyClient):
+    """SpotifyClient whose track search runs on the event loop.
+
+    Both search strategies go out at once. The strict `track: artist:` query
+    wins as soon as it returns a hit. The combined query may win early only if
+    its top hit matches the recognized title and artist; otherwise it is kept
+    as the fallback for when the strict query comes back empty.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, request_timeout: Tuple[int, int] = None):
+        super().__init__(client_id, client_secret, request_timeout)
+        self._async_session: Optional[aiohttp.ClientSession] = None
+
+    async def close(self) -> None:
+        if self._async_session and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+
+    async def search_track_async(self, title: str, artist: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        strict = asyncio.create_task(self._search_request_async(f'track:{title} artist:{artist}'))
+        combined = asyncio.create_task(self._search_request_async(f"{title} {artist}"))
+        tasks = (strict, combined)
+        try:
+            while True:
+                if strict.done() and self._task_result(strict):
+                    return strict.result(), 1
+                if combined.done() and self._task_result(combined):
+                    if strict.done() or self._matches(combined.result(), title, artist):
+                        return combined.result(), 2
+                if strict.done() and combined.done():
+                    # A miss is only a real "not found" (and cacheable) if neither query failed
+                    error = strict.exception() or combined.exception()
+                    if error:
+                        raise error
+                    return None, 2
+                await asyncio.wait([task for task in tasks if not task.done()], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _task_result(task: asyncio.Task) -> Optional[Dict[str, Any]]:
+        # A failed query counts as no hit so the other query's result still wins
+        return None if task.exception() else task.result()
+
+    @classmethod
+    def _matches(cls, spotify_track: Dict[str, Any], title: str, artist: str) -> bool:
+        wanted_title = cls._normalize(title)
+        found_title = cls._normalize(spotify_track.get('name') or '')
+        if not wanted_title or not found_title:
+            return False
+        if wanted_title not in found_title and found_title not in wanted_title:
+            return False
+        wanted_artists = cls._artist_names(artist)
+        if not wanted_artists:
+            return False
+        return any(
+            cls._normalize(found.get('name') or '') in wanted_artists
+            for found in spotify_track.get('artists') or []
+        )
+
+    @classmethod
+    def _artist_names(cls, artist: str) -> set:
+        """Whole normalized names in a credit like "A feat. B & C", plus the credit itself."""
+        parts = re.split(r'\s*(?:,|&|\+|/|\bfeat\.?|\bft\.?|\bfeaturing\b|\bx\b|\band\b|\bwith\b)\s*', artist or '', flags=re.IGNORECASE)
+        names = {cls._normalize(part) for part in parts + [artist or '']}
+        names.discard('')
+        return names
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = re.sub(r'[\(\[].*?[\)\]]', ' ', text.lower())  # drop "(feat. ...)", "[Remix]"
+        return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+    async def get_artist_images_async(self, artist_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Fetches primary images for up to 50 artist IDs in one request."""
+        if not artist_ids:
+            return {}
+        try:
+            payload = await self._api_get_async('/artists', {'ids': ','.join(artist_ids)})
+        except aiohttp.ClientError as exc:
+            raise ConnectionError(f"Error fetching artist metadata from Spotify: {exc}") from exc
+        return {
+            artist.get('id'): self._select_largest_image(artist.get('images') or [])
+            for artist in payload.get('artists') or []
+            if artist
+        }
+
+    async def _search_request_async(self, query: str) -> Optional[Dict[str, Any]]:
+        try:
+            search_results = await self._api_get_async('/search', {'q': query, 'type': 'track', 'limit': 1})
+        except aiohttp.ClientError as exc:
+            raise ConnectionError(f"Error searching Spotify: {exc}") from exc
+        items = (search_results.get('tracks') or {}).get('items') or []
+        return items[0] if items else None
+
+    async def _get_token_async(self, stale_token: Optional[str] = None) -> str:
+        expiring = time.monotonic() >= self._token_expires_at - self.TOKEN_REFRESH_MARGIN_SECONDS
+        if self._token and not expiring and stale_token != self._token:
+            return self._token
+        # Refreshes are rare, so they reuse the locked synchronous path off the loop
+        return await asyncio.to_thread(self.get_token, stale_token)
+
+    def _get_async_session(self) -> aiohttp.ClientSession:
+        if self._async_session is None or self._async_session.closed:
+            connect_timeout, read_timeout = self._timeout
+            self._async_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+                connector=aiohttp.TCPConnector(limit=self.POOL_SIZE)
+            )
+        return self._async_session
+
+    async def _api_get_async(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of _api_get with the same retry rules."""
+        for attempt in range(self.MAX_RETRIES + 1):
+            token = await self._get_token_async()
+            final_attempt = attempt == self.MAX_RETRIES
+            try:
+                async with self._get_async_session().get(
+                    f"{self.API_URL}{path}",
+                    headers={'Authorization': f'Bearer {token}'},
+                    params=params
+                ) as response:
+                    status = response.status
+                    retry_after = response.headers.get('Retry-After', '')
+                    if status < 400 or final_attempt:
+                        response.raise_for_status()
+                        return await response.json()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if final_attempt:
+                    raise
+                await asyncio.sleep(self._backoff_delay(attempt))
+                continue
+
+            if status == 401:
+                await self._get_token_async(stale_token=token)
+            elif status == 429:
+                await asyncio.sleep(self._retry_after_seconds(retry_after, attempt))
+            elif status >= 500:
+                await asyncio.sleep(self._backoff_delay(attempt))
+            else:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=status, message=response.reason or ''
+                )
+        raise ConnectionError(f"Spotify request to {path} failed after {self.MAX_RETRIES} retries")
+
+class ArtistImageBatcher:
+    """Coalesces artist-image lookups from all stations into shared /v1/artists calls.
+
+    IDs requested within `window_seconds` of each other are deduplicated and
+    sent 50 at a time. Callers asking for an ID that is already queued or in
+    flight wait on the same future instead of issuing another request.
+    """
+
+    MAX_IDS_PER_REQUEST = 50
+
+    def __init__(self, spotify_client: AsyncSpotifyClient, window_seconds: float = 0.5):
+        self.spotify_client = spotify_client
+        self.window_seconds = window_seconds
+        self._queued: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def get_images(self, artist_ids: List[str]) -> Dict[str, Optional[str]]:
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        for artist_id in artist_ids:
+            if not artist_id or artist_id in futures:
+                continue
+            future = self._in_flight.get(artist_id) or self._queued.get(artist_id)
+            if future is None:
+                future = loop.create_future()
+                self._queued[artist_id] = future
+            futures[artist_id] = future
+
+        if len(self._queued) >= self.MAX_IDS_PER_REQUEST:
+            self._start_flush(delay=0)
+        elif self._queued and self._flush_task is None:
+            self._start_flush(delay=self.window_seconds)
+
+        results = await asyncio.gather(*(asyncio.shield(future) for future in futures.values()))
+        return dict(zip(futures.keys(), results))
+
+    def _start_flush(self, delay: float) -> None:
+        if self._flush_task is not None and delay > 0:
+            return
+        self._flush_task = asyncio.create_task(self._flush(delay))
+
+    async def _flush(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        batch, self._queued = self._queued, {}
+        if self._flush_task is asyncio.current_task():
+            self._flush_task = None
+        if not batch:
+            return
+
+        self._in_flight.update(batch)
+        artist_ids = list(batch)
+        await asyncio.gather(*(
+            self._fetch_chunk(artist_ids[start:start + self.MAX_IDS_PER_REQUEST], batch)
+            for start in range(0, len(artist_ids), self.MAX_IDS_PER_REQUEST)
+        ))
+
+    async def _fetch_chunk(self, chunk: List[str], futures: Dict[str, asyncio.Future]) -> None:
+        try:
+            images = await self.spotify_client.get_artist_images_async(chunk)
+        except Exception as exc:
+            for artist_id in chunk:
+                future = futures[artist_id]
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()  # callers that timed out must not leave it unretrieved
+        else:
+            for artist_id in chunk:
+                future = futures[artist_id]
+                if not future.done():
+                    future.set_result(images.get(artist_id))
+        finally:
+            for artist_id in chunk:
+                self._in_flight.pop(artist_id, None)
+
+class SpotifyResolutionCache:
+    """Maps recognized Shazam tracks to their Spotify search result.
+
+    An in-memory LRU sits in front of a Postgres table so repeat plays resolve
+    without network calls, also across restarts. Entries are keyed by the Shazam
+    track key with a normalized (title, subtitle) fallback, and "not found"
+    results are cached with a shorter TTL.
+
+    The Postgres tier is best-effort: its calls run in a worker thread with a
+    short timeout, and after a failure it is skipped for `db_retry_seconds`, so
+    a database outage degrades the cache to the in-memory LRU instead of
+    stalling the event loop.
+    """
+
+    DB_TIMEOUT_SECONDS = 2.0
+    DB_RETRY_SECONDS = 30.0
+
+    def __init__(
+        self,
+        db_connector: Optional[PostgresConnector],
+        max_entries: int = 2048,
+        ttl_seconds: int = 7 * 24 * 3600,
+        negative_ttl_seconds: int = 6 * 3600,
+        logger=None,
+        db_timeout_seconds: float = DB_TIMEOUT_SECONDS,
+        db_retry_seconds: float = DB_RETRY_SECONDS
+    ):
+        self.db_connector = db_connector
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.logger = logger
+        self.db_timeout_seconds = db_timeout_seconds
+        self.db_retry_seconds = db_retry_seconds
+        self._db_retry_at = 0.0
+        self._entries: 'OrderedDict[str, Tuple[Optional[Dict[str, Any]], float]]' = OrderedDict()
+
+    @staticmethod
+    def cache_keys(shazam_track: Dict[str, Any]) -> List[str]:
+        keys: List[str] = []
+        if shazam_track.get('key'):
+            keys.append(f"shazam:{shazam_track['key']}")
+        title = (shazam_track.get('title') or '').strip().lower()
+        subtitle = (shazam_track.get('subtitle') or '').strip().lower()
+        if title:
+            keys.append(f"title:{title}|{subtitle}")
+        return keys
+
+    async def lookup(self, shazam_track: Dict[str, Any]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Returns (hit, spotify_track); a hit with no track is a cached miss."""
+        keys = self.cache_keys(shazam_track)
+        now = time.monotonic()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry[1] <= now:
+                del self._entries[key]
+                continue
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+        for key, (spotify_track, found, age) in (await self._load(keys)).items():
+            ttl = self.ttl_seconds if found else self.negative_ttl_seconds
+            if age < ttl:
+                self._remember(key, spotify_track if found else None, ttl - age)
+        for key in keys:
+            if key in self._entries:
+                return True, self._entries[key][0]
+        return False, None
+
+    async def store(self, shazam_track: Dict[str, Any], spotify_track: Optional[Dict[str, Any]]) -> None:
+        keys = self.cache_keys(shazam_track)
+        ttl = self.ttl_seconds if spotify_track else self.negative_ttl_seconds
+        for key in keys:
+            self._remember(key, spotify_track, ttl)
+
+        if keys:
+            await self._call_db('persisting Spotify resolution', self.db_connector.store_resolution, keys, spotify_track)
+
+    async def _load(self, keys: List[str]) -> Dict[str, Tuple[Optional[Dict[str, Any]], bool, float]]:
+        if not keys:
+            return {}
+        return await self._call_db('loading Spotify resolution cache', self.db_connector.get_cached_resolutions, keys) or {}
+
+    async def _call_db(self, action: str, func, *args) -> Any:
+        if not self.db_connector or time.monotonic() < self._db_retry_at:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(func, *args), self.db_timeout_seconds)
+        except Exception as exc:
+            # A timed-out call keeps its thread until the pool gives up, so back off instead of piling more on
+            self._db_retry_at = time.monotonic() + self.db_retry_seconds
+            if self.logger:
+                reason = f"timed out after {self.db_timeout_seconds:g}s" if isinstance(exc, asyncio.TimeoutError) else exc
+                self.logger.warning(
+                    f"Failed {action}, using the in-memory cache for {self.db_retry_seconds:g}s: {reason}",
+                    extra={'station': 'system'}
+                )
+            return None
+
+    def _remember(self, key: str, spotify_track: Optional[Dict[str, Any]], ttl: float) -> None:
+        self._entries[key] = (spotify_track, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
 class StreamCapture:
     STREAM_TIMEOUT = (35, 65)  # (connect, read)
+    READ_CHUNK_SIZE = 64 * 1024
+    BUDGET_HEADROOM = 1.1  # read slightly past the nominal bitrate to cover frame padding
 
-    def __init__(self, temp_dir: str = None):
-        self.temp_dir = temp_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), './temp')
-        os.makedirs(self.temp_dir, exist_ok=True)
+    def __init__(
+        self,
+        buffer_seconds: int = 0,
+        logger=None,
+        audio_pool: Optional[AudioJobPool] = None,
+        decode_sample_rate: Optional[int] = None
+    ):
+        self.buffer_seconds = buffer_seconds
+        self.logger = logger
+        self.audio_pool = audio_pool
+        self.decode_sample_rate = decode_sample_rate
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._readers: Dict[str, StationStreamReader] = {}
     
-    def capture(self, stream_url: str, station: str, duration: int = 20, live_delay: Optional[int] = None) -> str:
-        audio_data = self._download_stream(stream_url, duration)
-        file_path = self._save_audio(audio_data, station)
-        
+    async def capture(self, stream_url: str, station: str, duration: int = 20, live_delay: Optional[int] = None) -> bytes:
+        """Returns an in-memory audio snippet; nothing is written to disk."""
+        if self.buffer_seconds >= duration:
+            audio_data = await self._read_buffered(stream_url, station, duration, live_delay)
+            audio_data = audio_frames.trim_leading(audio_data, 0) or audio_data  # buffer slices start mid-frame
+            live_delay = None  # the reader drops the intro once per connection
+        else:
+            audio_data = await self._download_stream(stream_url, duration)
         if live_delay:
-            self._trim_live_delay(file_path, live_delay)
+            if self.audio_pool:
+                audio_data = await self.audio_pool.run(self._trim_live_delay, audio_data, live_delay)
+            else:
+                audio_data = await asyncio.to_thread(self._trim_live_delay, audio_data, live_delay)
             
-        return file_path
+        return audio_data
+
+    async def retain(self, stations: Set[str]) -> None:
+        """Stops the readers of stations that are no longer configured."""
+        for station in [name for name in self._readers if name not in stations]:
+            await self._readers.pop(station).stop()
+
+    def recent_pcm(self, station: str, duration: int) -> Optional[np.ndarray]:
+        """Already-decoded audio for the station's latest `duration` seconds, if its reader decodes continuously."""
+        reader = self._readers.get(station)
+        return reader.recent_pcm(duration) if reader else None
+
+    async def close(self) -> None:
+        for reader in self._readers.values():
+            await reader.stop()
+        self._readers.clear()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.STREAM_TIMEOUT
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+            )
+        return self._session
+
+    async def _read_buffered(self, stream_url: str, station: str, duration: int, live_delay: Optional[int]) -> bytes:
+        reader = self._readers.get(station)
+        if reader is None or reader.stream_url != stream_url or reader.live_intro != live_delay:
+            if reader:
+                await reader.stop()
+            reader = StationStreamReader(
+                station,
+                stream_url,
+                self._get_session,
+                self.buffer_seconds,
+                live_intro=live_delay,
+                logger=self.logger,
+                decode_sample_rate=self.decode_sample_rate
+            )
+            self._readers[station] = reader
+        reader.start()
+        return await reader.snapshot(duration, timeout=self.STREAM_TIMEOUT[0] + duration)
     
-    def _download_stream(self, stream_url: str, duration: int) -> bytes:
+    async def _download_stream(self, stream_url: str, duration: int) -> bytes:
+        """Reads the stream until either the time budget or the bitrate-derived byte budget is spent.
+
+        Icecast servers push a burst of buffered audio on connect, so the byte budget
+        usually ends the read well before the wall-clock deadline.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        audio_data = bytearray()
+
         try:
-            response = requests.get(stream_url, stream=True, timeout=self.STREAM_TIMEOUT)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as exc:
+            async with self._get_session().get(stream_url) as response:
+                response.raise_for_status()
+                byte_budget = self._byte_budget(response.headers, duration)
+
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        chunk = await asyncio.wait_for(
+                            response.content.read(self.READ_CHUNK_SIZE),
+                            timeout=remaining
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    if not chunk:
+                        break
+                    audio_data.extend(chunk)
+                    if byte_budget and len(audio_data) >= byte_budget:
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
             raise ConnectionError(f"Failed downloading stream '{stream_url}': {exc}") from exc
 
-        start_time = time.time()
-        audio_data = bytearray()
-        
-        for chunk in response.iter_content(chunk_size=1024):
-            audio_data.extend(chunk)
-            if time.time() - start_time > duration:
-                break
-                
         return bytes(audio_data)
+
+    def _byte_budget(self, headers: Any, duration: int) -> Optional[int]:
+        bitrate = headers.get('icy-br', '').split(',')[0].strip()
+        try:
+            kbps = int(bitrate)
+        except ValueError:
+            return None
+        if kbps <= 0:
+            return None
+        return int(kbps * 1000 / 8 * duration * self.BUDGET_HEADROOM)
     
-    def _save_audio(self, audio_data: bytes, station: str) -> str:
-        file_path = os.path.join(self.temp_dir, f'stream_{station}.mp3')
-        with open(file_path, 'wb') as file:
-            file.write(audio_data)
-        return file_path
-    
-    def _trim_live_delay(self, file_path: str, live_delay: int) -> None:
-        audio = AudioSegment.from_mp3(file_path)
-        audio = audio[live_delay * 1000:]
-        audio.export(file_path, format="mp3")
+    def _trim_live_delay(self, audio_data: bytes, live_delay: int) -> bytes:
+        trimmed = audio_frames.trim_leading(audio_data, live_delay)
+        if trimmed is not None:
+            return trimmed
+
+        # Unknown container: decode from a pipe and export plain WAV, which pydub
+        # writes itself, so there are still no temp files and no lossy re-encode
+        audio = AudioSegment.from_file(io.BytesIO(audio_data), start_second=live_delay)
+        return audio.export(io.BytesIO(), format="wav").getvalue()
+
+class SimilarityGate:
+    """Skips recognition while a station's audio still matches the last identified song.
+
+    Each snippet is compared with the station's previous one. The skip window is
+    anchored at the last real recognition, so a missed song change is caught
+    after at most `max_skip_seconds`.
+    """
+
+    def __init__(self, threshold: float, max_skip_seconds: int):
+        self.threshold = threshold
+        self.max_skip_seconds = max_skip_seconds
+        self._previous: Dict[str, Fingerprint] = {}
+        self._recognized_at: Dict[str, float] = {}
+
+    def is_same_song(self, station: str, fingerprint: Fingerprint) -> bool:
+        previous = self._previous.get(station)
+        recognized_at = self._recognized_at.get(station)
+        if previous is None or recognized_at is None:
+            return False
+        if time.monotonic() - recognized_at > self.max_skip_seconds:
+            return False
+        if fingerprint.similarity(previous) < self.threshold:
+            return False
+        self._previous[station] = fingerprint
+        return True
+
+    def remember(self, station: str, fingerprint: Optional[Fingerprint]) -> None:
+        if fingerprint is None:
+            self.forget(station)
+            return
+        self._previous[station] = fingerprint
+        self._recognized_at[station] = time.monotonic()
+
+    def forget(self, station: str) -> None:
+        self._previous.pop(station, None)
+        self._recognized_at.pop(station, None)
+
+class PollScheduler:
+    """Decides when each station is polled next from what it is currently playing.
+
+    A new song seen right after a regular poll is assumed to have started just
+    after that poll, so its end estimate errs early. Any other song (first poll,
+    a long wait, a song seen before) has an unknown start and is treated like
+    an unknown state: the station is polled every `poll_interval` seconds.
+    """
+
+    END_MARGIN_SECONDS = 5
+    POLL_LATENESS_SECONDS = 10  # how late a regular poll may run (busy cycles) and still bound the start
+
+    def __init__(self, poll_interval: int, max_interval: int):
+        self.poll_interval = poll_interval
+        self.max_interval = max(poll_interval, max_interval)
+        self._next_poll: Dict[str, float] = {}
+        self._last_poll: Dict[str, float] = {}
+        self._poll_gaps: Dict[str, float] = {}
+        self._songs: Dict[str, Tuple[str, float]] = {}  # station -> (song id, expected end)
+
+    def due(self, stations: List[StationConfig]) -> List[StationConfig]:
+        now = time.monotonic()
+        return [station for station in stations if self._next_poll.get(station.name, 0) <= now]
+
+    def seconds_until_next(self, stations: List[StationConfig]) -> float:
+        now = time.monotonic()
+        upcoming = [self._next_poll.get(station.name, 0) for station in stations]
+        if not upcoming:
+            return self.poll_interval
+        return max(1.0, min(upcoming) - now)
+
+    def begin_poll(self, station: str) -> None:
+        now = time.monotonic()
+        last_poll = self._last_poll.get(station)
+        self._poll_gaps[station] = now - last_poll if last_poll is not None else float('inf')
+        self._last_poll[station] = now
+        self._next_poll[station] = now + self.poll_interval
+
+    def song_playing(
+        self,
+        station: str,
+        song_id: Optional[str] = None,
+        duration_ms: Optional[int] = None,
+        is_new: bool = True
+    ) -> None:
+        """Schedules the next poll just after the current song should end.
+
+        Without a song id the station's tracked song is assumed to continue. A
+        song that is not new (e.g. already recorded before a restart or a failed
+        poll) may have started at any time, so it keeps the short interval.
+        """
+        now = time.monotonic()
+        tracked = self._songs.get(station)
+        if song_id and (tracked is None or tracked[0] != song_id):
+            gap = self._poll_gaps.get(station, float('inf'))
+            if not duration_ms or not is_new or gap > self.poll_interval + self.POLL_LATENESS_SECONDS:
+                self._songs.pop(station, None)
+                return
+            started_at = self._last_poll.get(station, now) - gap
+            tracked = (song_id, started_at + duration_ms / 1000)
+            self._songs[station] = tracked
+        if tracked is None:
+            return
+
+        expected_end = tracked[1] + self.END_MARGIN_SECONDS
+        if expected_end <= now:
+            return  # overran the estimate; keep the short unknown-state interval
+        self._next_poll[station] = min(expected_end, now + self.max_interval)
+
+    def state_unknown(self, station: str) -> None:
+        self._songs.pop(station, None)
 
 class SongRecognizer:
     def __init__(self):
         self.shazam = Shazam()
     
-    async def recognize(self, audio_path: str) -> Dict[str, Any]:
-        return await self.shazam.recognize(audio_path)
+    async def recognize(self, audio: bytes) -> Dict[str, Any]:
+        return await self.shazam.recognize(audio)
 
 class TrackProcessor:
-    def __init__(self, db_connector: PostgresConnector, spotify_client: SpotifyClient, logger=None):
+    def __init__(
+        self,
+        db_connector: PostgresConnector,
+        spotify_client: SpotifyClient,
+        logger=None,
+        image_batcher: Optional['ArtistImageBatcher'] = None,
+        play_writer: Optional[PlayWriter] = None
+    ):
         self.db_connector = db_connector
         self.spotify_client = spotify_client
         self.logger = logger
+        self.image_batcher = image_batcher
+        self.play_writer = play_writer
     
-    def process_track(self, track: Dict[str, Any], shazam_track: Dict[str, Any], spotify_track: Dict[str, Any], station: str) -> None:
+    async def process_track(self, track: Dict[str, Any], shazam_track: Dict[str, Any], spotify_track: Dict[str, Any], station: str) -> None:
         artist_images: Dict[str, Optional[str]] = {}
         if self.spotify_client:
             try:
-                artist_images = self._fetch_artist_images(spotify_track)
+                artist_images = await self._fetch_artist_images(spotify_track)
             except Exception as exc:
                 if self.logger:
                     self.logger.warning(
@@ -338,10 +962,13 @@ class TrackProcessor:
 
         simplified = self._simplify_spotify_data(spotify_track, shazam_track, artist_images)
         self._add_external_links(simplified, shazam_track, spotify_track)
-        self.db_connector.index_song_if_needed(simplified)
-        self.db_connector.index_play(simplified, station)
+        if self.play_writer:
+            await self.play_writer.submit(simplified, station)
+        else:
+            self.db_connector.index_song_if_needed(simplified)
+            self.db_connector.index_play(simplified, station)
     
-    def _fetch_artist_images(self, raw: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    async def _fetch_artist_images(self, raw: Dict[str, Any]) -> Dict[str, Optional[str]]:
         artist_ids: List[str] = []
         seen: Set[str] = set()
 
@@ -364,7 +991,7 @@ class TrackProcessor:
         stored_images: Dict[str, Optional[str]] = {}
 
         try:
-            stored_images = self.db_connector.get_artist_images(artist_ids)
+            stored_images = await asyncio.to_thread(self.db_connector.get_artist_images, artist_ids)
         except Exception as exc:
             if self.logger:
                 self.logger.warning(
@@ -375,7 +1002,10 @@ class TrackProcessor:
         missing_ids: List[str] = [artist_id for artist_id in artist_ids if not stored_images.get(artist_id)]
 
         if missing_ids:
-            spotify_images = self.spotify_client.get_artist_images(missing_ids)
+            if self.image_batcher:
+                spotify_images = await self.image_batcher.get_images(missing_ids)
+            else:
+                spotify_images = await asyncio.to_thread(self.spotify_client.get_artist_images, missing_ids)
             for artist_id, image in spotify_images.items():
                 stored_images[artist_id] = image
 
@@ -525,102 +1155,322 @@ class TrackProcessor:
 
 class RadioPlaysTracker:
     STATION_TIMEOUT_SECONDS = 100
+    SNIPPET_SECONDS = 10
+    DEFAULT_POLL_INTERVAL_SECONDS = 20
+    DEFAULT_MAX_POLL_INTERVAL_SECONDS = 300
+    SKIP_STATS_LOG_INTERVAL_SECONDS = 600
+    CONFIG_CHECK_INTERVAL_SECONDS = 30
+    DEFAULT_RESOLUTION_CACHE_SIZE = 2048
+    DEFAULT_RESOLUTION_CACHE_TTL_HOURS = 168
+    DEFAULT_RESOLUTION_CACHE_NEGATIVE_TTL_HOURS = 6
+    DEFAULT_MAX_CONCURRENCY = 3
+    DEFAULT_STREAM_BUFFER_SECONDS = 30
+    DEFAULT_SIMILARITY_THRESHOLD = 0.97
+    DEFAULT_SIMILARITY_MAX_SKIP_SECONDS = 180
+    DEFAULT_NON_MUSIC_MAX_SKIP_SECONDS = 180
+    DEFAULT_PLAY_FLUSH_BATCH_SIZE = 100
+    DEFAULT_PLAY_MAX_PENDING = 10000
 
     def __init__(self):
         self.config_manager = ConfigManager()
-        self.spotify_client = SpotifyClient(
+        self.spotify_client = AsyncSpotifyClient(
             self.config_manager.client_id,
             self.config_manager.client_secret
         )
-        self.stream_capture = StreamCapture()
         self.song_recognizer = SongRecognizer()
         self.logger = Helper.get_rotating_logger(
             'RadioPlaysFetch',
             log_file='radio_plays_fetch.log',
             station_info=True
         )
-        self.track_processor = TrackProcessor(PostgresConnector(), self.spotify_client, self.logger)
+        self.similarity_gate = SimilarityGate(
+            threshold=self._resolve_setting('similarity_threshold', self.DEFAULT_SIMILARITY_THRESHOLD, cast=float),
+            max_skip_seconds=self._resolve_setting('similarity_max_skip_seconds', self.DEFAULT_SIMILARITY_MAX_SKIP_SECONDS)
+        )
+        # Off by default until the speech/silence thresholds are calibrated against real stations
+        self.skip_non_music = bool(self.config_manager.worker_config.get('skip_non_music', False))
+        self.non_music_max_skip_seconds = self._resolve_setting(
+            'non_music_max_skip_seconds', self.DEFAULT_NON_MUSIC_MAX_SKIP_SECONDS
+        )
+        self._non_music_since: Dict[str, float] = {}
+        self.audio_pool = AudioJobPool(self._resolve_setting('audio_workers', 0) or None)
+        self.stream_capture = StreamCapture(
+            buffer_seconds=self._resolve_setting('stream_buffer_seconds', self.DEFAULT_STREAM_BUFFER_SECONDS),
+            logger=self.logger,
+            audio_pool=self.audio_pool,
+            decode_sample_rate=audio_analysis.ANALYSIS_SAMPLE_RATE if self._needs_analysis() else None
+        )
+        self.skip_stats: Dict[str, Dict[str, int]] = {}
+        self._skip_stats_logged_at = 0.0
+        self.scheduler = PollScheduler(
+            poll_interval=self._resolve_setting('poll_interval_seconds', self.DEFAULT_POLL_INTERVAL_SECONDS, minimum=1),
+            max_interval=self._resolve_setting('max_poll_interval_seconds', self.DEFAULT_MAX_POLL_INTERVAL_SECONDS, minimum=1)
+        )
+        db_connector = PostgresConnector()
+        self.play_writer = PlayWriter(
+            PostgresConnector,
+            self._resolve_spool_path(),
+            batch_size=self._resolve_setting('play_flush_batch_size', self.DEFAULT_PLAY_FLUSH_BATCH_SIZE, minimum=1),
+            max_pending=self._resolve_setting('play_max_pending', self.DEFAULT_PLAY_MAX_PENDING, minimum=1),
+            logger=self.logger
+        )
+        self.track_processor = TrackProcessor(
+            db_connector,
+            self.spotify_client,
+            self.logger,
+            image_batcher=ArtistImageBatcher(self.spotify_client),
+            play_writer=self.play_writer
+        )
+        self.resolution_cache = SpotifyResolutionCache(
+            db_connector,
+            max_entries=self._resolve_setting('resolution_cache_size', self.DEFAULT_RESOLUTION_CACHE_SIZE, minimum=1),
+            ttl_seconds=self._resolve_setting('resolution_cache_ttl_hours', self.DEFAULT_RESOLUTION_CACHE_TTL_HOURS) * 3600,
+            negative_ttl_seconds=self._resolve_setting(
+                'resolution_cache_negative_ttl_hours', self.DEFAULT_RESOLUTION_CACHE_NEGATIVE_TTL_HOURS
+            ) * 3600,
+            logger=self.logger
+        )
         self.heartbeat_path = self._resolve_heartbeat_path()
+        self._station_names: Set[str] = set()
+        self.max_concurrency = self._resolve_setting('max_concurrency', self.DEFAULT_MAX_CONCURRENCY, minimum=1)
     
     async def process_station(self, station: StationConfig) -> None:
-        try:
-            # Capture stream
-            snippet_filepath = self.stream_capture.capture(
-                station.stream_url,
-                station.name,
-                duration=10,
-                live_delay=station.live_intro
-            )
-            
-            # Recognize song
-            song_info = await self.song_recognizer.recognize(snippet_filepath)
-            if not song_info or 'track' not in song_info:
-                return
-            
-            track = song_info['track']
-            title, artist = track['title'], track['subtitle']
-            
-            # Search Spotify
-            spotify_track, try_num = self.spotify_client.search_track(title, artist)
-            if not spotify_track:
+        # Capture stream
+        snippet = await self.stream_capture.capture(
+            station.stream_url,
+            station.name,
+            duration=self.SNIPPET_SECONDS,
+            live_delay=station.live_intro
+        )
+        
+        label, fingerprint = await self._analyze(snippet, station.name)
+        if self._defer_non_music(station.name, label):
+            # Non-music is deferred to the next cycle rather than sent to Shazam
+            self.similarity_gate.forget(station.name)
+            self.scheduler.state_unknown(station.name)
+            self._record_skip(station.name, label)
+            return
+        if fingerprint is not None and self.similarity_gate.is_same_song(station.name, fingerprint):
+            self.scheduler.song_playing(station.name)
+            self._record_skip(station.name, 'same_song')
+            return
+
+        # Recognize song
+        song_info = await self.song_recognizer.recognize(snippet)
+        if not song_info or 'track' not in song_info:
+            self.similarity_gate.forget(station.name)
+            self.scheduler.state_unknown(station.name)
+            return
+        
+        track = song_info['track']
+        title, artist = track['title'], track['subtitle']
+        
+        # Search Spotify, unless this Shazam track was resolved before
+        cached, spotify_track = await self.resolution_cache.lookup(track)
+        if cached:
+            try_num = 'cached'
+        else:
+            spotify_track, try_num = await self.spotify_client.search_track_async(title, artist)
+            await self.resolution_cache.store(track, spotify_track)
+        if not spotify_track:
+            if not cached:
                 self.logger.warning(
                     f'Spotify did not find: {title} by {artist}',
                     extra={'station': station.name}
                 )
-                return
-                
-            if spotify_track['id'] == station.last_song_recorded:
-                return
-            
-            self.logger.info(
-                f'Spotify found: {title} by {artist} ({try_num if try_num == 1 else f"{try_num}, orig: {title} by {artist}"})',
-                extra={'station': station.name}
+            self.similarity_gate.forget(station.name)
+            self.scheduler.state_unknown(station.name)
+            return
+
+        self.similarity_gate.remember(station.name, fingerprint)
+        self.scheduler.song_playing(
+            station.name,
+            spotify_track['id'],
+            spotify_track.get('duration_ms'),
+            is_new=spotify_track['id'] != station.last_song_recorded
+        )
+        if spotify_track['id'] == station.last_song_recorded:
+            return
+        
+        self.logger.info(
+            f'Spotify found: {title} by {artist} ({try_num if try_num == 1 else f"{try_num}, orig: {title} by {artist}"})',
+            extra={'station': station.name}
+        )
+        
+        # Process track
+        await self.track_processor.process_track(spotify_track, track, spotify_track, station.name)
+        self.config_manager.update_last_song_recorded(station.name, spotify_track['id'])
+    
+    async def _analyze(self, snippet: bytes, station_name: str) -> Tuple[Optional[str], Optional[Fingerprint]]:
+        """Decodes the snippet once and returns its content label and fingerprint."""
+        if not self._needs_analysis():
+            return None, None
+        pcm = self.stream_capture.recent_pcm(station_name, self.SNIPPET_SECONDS)
+        try:
+            if pcm is None:
+                pcm = await self.audio_pool.run(audio_analysis.decode_pcm, snippet)
+            return await self.audio_pool.run(self._analyze_pcm, pcm)
+        except Exception as exc:
+            self.logger.debug(
+                f"Could not decode snippet for analysis: {exc}",
+                extra={'station': station_name}
             )
-            
-            # Process track
-            self.track_processor.process_track(spotify_track, track, spotify_track, station.name)
-            self.config_manager.update_last_song_recorded(station.name, spotify_track['id'])
-            
-        except Exception as e:
-            self.logger.error(
-                f"Error processing station '{station.name}': {str(e)}",
+            return None, None
+
+    def _defer_non_music(self, station_name: str, label: Optional[str]) -> bool:
+        """Whether to skip recognition for a non-music snippet.
+
+        A station classified as non-music for longer than
+        `non_music_max_skip_seconds` is recognized anyway, so a misclassified
+        song is caught after at most that long.
+        """
+        if label not in (audio_analysis.SPEECH, audio_analysis.SILENCE):
+            self._non_music_since.pop(station_name, None)
+            return False
+        now = time.monotonic()
+        since = self._non_music_since.setdefault(station_name, now)
+        if now - since > self.non_music_max_skip_seconds:
+            self._non_music_since[station_name] = now
+            return False
+        return True
+
+    def _analyze_pcm(self, pcm: np.ndarray) -> Tuple[Optional[str], Optional[Fingerprint]]:
+        label = audio_analysis.classify(pcm) if self.skip_non_music else None
+        fingerprint = audio_analysis.fingerprint(pcm) if self.similarity_gate.threshold > 0 else None
+        return label, fingerprint
+
+    def _needs_analysis(self) -> bool:
+        return self.skip_non_music or self.similarity_gate.threshold > 0
+
+    def _format_skip_stats(self) -> str:
+        return ', '.join(
+            f"{station_name} ({', '.join(f'{reason} {count}' for reason, count in sorted(station_stats.items()))})"
+            for station_name, station_stats in sorted(self.skip_stats.items())
+        )
+
+    def _record_skip(self, station_name: str, reason: str) -> None:
+        station_stats = self.skip_stats.setdefault(station_name, {})
+        station_stats[reason] = station_stats.get(reason, 0) + 1
+        self.logger.debug(
+            f"Skipped recognition ({reason}), saved so far: {station_stats}",
+            extra={'station': station_name}
+        )
+
+    async def poll_station(self, station: StationConfig, semaphore: asyncio.Semaphore) -> StationOutcome:
+        async with semaphore:
+            self.scheduler.begin_poll(station.name)
+            station_started = time.perf_counter()
+            status = 'ok'
+            try:
+                await asyncio.wait_for(
+                    self.process_station(station),
+                    timeout=self.STATION_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                status = 'timeout'
+                self.logger.error(
+                    f"Processing station '{station.name}' timed out after {self.STATION_TIMEOUT_SECONDS}s",
+                    extra={'station': station.name}
+                )
+            except Exception as e:
+                status = 'error'
+                self.logger.error(
+                    f"Error processing station '{station.name}': {str(e)}",
+                    extra={'station': station.name}
+                )
+            finally:
+                self._write_heartbeat()
+
+            elapsed = time.perf_counter() - station_started
+            self.logger.debug(
+                f"Finished station '{station.name}' in {elapsed:.1f}s ({status})",
                 extra={'station': station.name}
             )
-    
+            return StationOutcome(station.name, status, elapsed)
+
+    async def run_cycle(self, stations: List[StationConfig]) -> CycleStats:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        cycle_started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(self.poll_station(station, semaphore) for station in stations)
+        )
+        return CycleStats(
+            outcomes=list(outcomes),
+            elapsed=time.perf_counter() - cycle_started,
+            concurrency=self.max_concurrency
+        )
+
     async def run(self):
+        self.play_writer.start()
+        try:
+            await self._run_forever()
+        finally:
+            await self.play_writer.close()
+            await self.stream_capture.close()
+            await self.spotify_client.close()
+            self.audio_pool.shutdown()
+            self.config_manager.close()
+            PostgresPool.close_shared()
+
+    async def _run_forever(self):
         while True:
-            stations = self.config_manager.get_stations()
+            stations = await self._current_stations()
+            due_stations = self.scheduler.due(stations)
+            if not due_stations:
+                await asyncio.sleep(self._seconds_until_next(stations))
+                continue
+
             self.logger.info(
-                f"Polling cycle started for {len(stations)} stations",
+                f"Polling cycle started for {len(due_stations)}/{len(stations)} stations (concurrency {self.max_concurrency})",
                 extra={'station': 'system'}
             )
-            cycle_started = time.perf_counter()
-            for station in stations:
-                station_started = time.perf_counter()
-                try:
-                    await asyncio.wait_for(
-                        self.process_station(station),
-                        timeout=self.STATION_TIMEOUT_SECONDS
-                    )
-                except asyncio.TimeoutError:
-                    self.logger.error(
-                        f"Processing station '{station.name}' timed out after {self.STATION_TIMEOUT_SECONDS}s",
-                        extra={'station': station.name}
-                    )
-                else:
-                    elapsed = time.perf_counter() - station_started
-                    self.logger.debug(
-                        f"Finished station '{station.name}' in {elapsed:.1f}s",
-                        extra={'station': station.name}
-                    )
-                finally:
-                    self._write_heartbeat()
-            cycle_elapsed = time.perf_counter() - cycle_started
+            stats = await self.run_cycle(due_stations)
+            slowest = stats.slowest
+            slowest_info = f", slowest: {slowest.name} {slowest.elapsed:.1f}s" if slowest else ''
+            self.logger.info(
+                f"Polling cycle completed in {stats.elapsed:.1f}s "
+                f"(ok: {stats.count('ok')}, timeout: {stats.count('timeout')}, error: {stats.count('error')}"
+                f"{slowest_info})",
+                extra={'station': 'system'}
+            )
+            if self.skip_stats and time.monotonic() - self._skip_stats_logged_at >= self.SKIP_STATS_LOG_INTERVAL_SECONDS:
+                self._skip_stats_logged_at = time.monotonic()
+                self.logger.info(
+                    f"Recognition calls saved: {self._format_skip_stats()}",
+                    extra={'station': 'system'}
+                )
+            await asyncio.sleep(self._seconds_until_next(stations))
+
+    def _seconds_until_next(self, stations: List[StationConfig]) -> float:
+        # Wake up at least every CONFIG_CHECK_INTERVAL_SECONDS so config edits apply promptly
+        return min(self.scheduler.seconds_until_next(stations), self.CONFIG_CHECK_INTERVAL_SECONDS)
+
+    async def _current_stations(self) -> List[StationConfig]:
+        """Returns the configured stations, applying config file edits made since the last call."""
+        Helper.check_config_changes()
+        stations = self.config_manager.get_stations()
+        names = {station.name for station in stations}
+        added, removed = names - self._station_names, self._station_names - names
+        if self._station_names and (added or removed):
             self.logger.info(
-                f"Polling cycle completed in {cycle_elapsed:.1f}s",
+                f"Stations reloaded from config (added: {', '.join(sorted(added)) or 'none'}, "
+                f"removed: {', '.join(sorted(removed)) or 'none'})",
                 extra={'station': 'system'}
             )
-            await asyncio.sleep(20)
+        for name in removed:
+            self.similarity_gate.forget(name)
+            self.scheduler.state_unknown(name)
+        if removed:
+            await self.stream_capture.retain(names)
+        self._station_names = names
+        return stations
+
+    def _resolve_setting(self, key: str, default: Any, cast=int, minimum: Any = 0) -> Any:
+        raw_value = self.config_manager.worker_config.get(key, default)
+        try:
+            return max(minimum, cast(raw_value))
+        except (TypeError, ValueError):
+            return default
 
     def _resolve_heartbeat_path(self) -> Path:
         env_path = os.getenv('WORKER_HEARTBEAT_PATH')
@@ -629,6 +1479,12 @@ class RadioPlaysTracker:
         base_dir = Path(os.getenv('WORKER_CONFIG_PATH') or os.path.dirname(os.path.abspath(__file__)))
         return Path(base_dir) / 'recognizer.heartbeat'
 
+    def _resolve_spool_path(self) -> str:
+        env_path = os.getenv('WORKER_PLAY_SPOOL_PATH')
+        if env_path:
+            return env_path
+        return os.path.join(os.path.dirname(os.path.abspath(self.config_manager.state_path)), 'plays.spool')
+
     def _write_heartbeat(self) -> None:
         try:
             self.heartbeat_path.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+StationState = Dict[str, Optional[str]]
+
+
+class StationStateStore(ABC):
+    """Per-station runtime state (e.g. the last recorded song) with coalesced writes.
+
+    `update` only records the change in memory; a flush runs `flush_seconds`
+    later and writes every station changed in the meantime in one go. Each
+    flush merges into what is already stored, so several workers can share one
+    store as long as they update different stations.
+    """
+
+    def __init__(self, flush_seconds: float = 2.0, logger=None):
+        self.flush_seconds = flush_seconds
+        self.logger = logger
+        self._pending: Dict[str, StationState] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    @abstractmethod
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the stored state as {'stations': {name: state}}, or None if there is none."""
+
+    @abstractmethod
+    def _write(self, states: Dict[str, StationState]) -> None:
+        """Merges `states` into the stored state."""
+
+    def update(self, station_name: str, state: StationState) -> None:
+        with self._lock:
+            self._pending[station_name] = state
+            if self.flush_seconds <= 0:
+                schedule = False
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                schedule = True
+            else:
+                return
+        if schedule:
+            self._timer.start()
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._timer = None
+            if not pending:
+                return
+            try:
+                self._write(pending)
+            except Exception as exc:
+                with self._lock:
+                    # Keep the failed changes unless a newer update superseded them
+                    self._pending = {**pending, **self._pending}
+                if self.logger:
+                    self.logger.error(
+                        f"Failed saving station state, will retry on next update: {exc}",
+                        extra={'station': 'system'}
+                    )
+
+    def close(self) -> None:
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+        self.flush()
+
+
+class FileStationStateStore(StationStateStore):
+    """JSON file written by write-then-rename, so a crash never leaves a torn file behind."""
+
+    def __init__(self, path: str, flush_seconds: float = 2.0, logger=None):
+        super().__init__(flush_seconds, logger)
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as exc:
+            if self.logger:
+                self.logger.error(
+                    f"Station state file '{self.path}' is unreadable, starting from config defaults: {exc}",
+                    extra={'station': 'system'}
+                )
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _write(self, states: Dict[str, StationState]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with open(f'{self.path}.lock', 'a', encoding='utf-8') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            data = self.load() or {}
+            stations = data.get('stations')
+            data['stations'] = {**(stations if isinstance(stations, dict) else {}), **states}
+
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+
+
+class PostgresStationStateStore(StationStateStore):
+    """Keeps station state in the `station_state` table so workers on several hosts can share it."""
+
+    def __init__(self, db_connector, flush_seconds: float = 2.0, logger=None):
+        super().__init__(flush_seconds, logger)
+        self.db_connector = db_connector
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        states = self.db_connector.get_station_states()
+        return {'stations': states} if states else None
+
+    def _write(self, states: Dict[str, StationState]) -> None:
+        self.db_connector.store_station_states(states)
@@ -0,0 +1,77 @@
+import pytest
+
+import recognizer
+from recognizer import PollScheduler
+
+POLL_INTERVAL = 20
+MAX_INTERVAL = 300
+SONG_MS = 200_000
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(recognizer.time, 'monotonic', clock)
+    return clock
+
+
+def next_poll_in(scheduler: PollScheduler, clock: Clock, station: str = 'radio') -> float:
+    return scheduler._next_poll[station] - clock.now
+
+
+def start_known_song(scheduler: PollScheduler, clock: Clock, song_id: str) -> None:
+    scheduler.begin_poll('radio')
+    scheduler.state_unknown('radio')
+    clock.now += POLL_INTERVAL
+    scheduler.begin_poll('radio')
+    scheduler.song_playing('radio', song_id, SONG_MS)
+
+
+def test_first_sighting_keeps_short_interval(clock):
+    scheduler = PollScheduler(POLL_INTERVAL, MAX_INTERVAL)
+
+    scheduler.begin_poll('radio')
+    scheduler.song_playing('radio', 'song-a', SONG_MS)
+
+    assert next_poll_in(scheduler, clock) == POLL_INTERVAL
+
+
+def test_new_song_after_long_wait_keeps_short_interval(clock):
+    scheduler = PollScheduler(POLL_INTERVAL, MAX_INTERVAL)
+    start_known_song(scheduler, clock, 'song-a')
+
+    clock.now += next_poll_in(scheduler, clock)
+    scheduler.begin_poll('radio')
+    scheduler.song_playing('radio', 'song-b', SONG_MS)
+
+    assert next_poll_in(scheduler, clock) == POLL_INTERVAL
+
+
+def test_song_seen_before_keeps_short_interval(clock):
+    scheduler = PollScheduler(POLL_INTERVAL, MAX_INTERVAL)
+    start_known_song(scheduler, clock, 'song-a')
+
+    # A failed poll forgets the song; it was already recorded, so its start is unknown
+    clock.now += next_poll_in(scheduler, clock)
+    scheduler.begin_poll('radio')
+    scheduler.state_unknown('radio')
+    clock.now += POLL_INTERVAL
+    scheduler.begin_poll('radio')
+    scheduler.song_playing('radio', 'song-a', SONG_MS, is_new=False)
+
+    assert next_poll_in(scheduler, clock) == POLL_INTERVAL
+
+
+def test_new_song_after_regular_poll_starts_at_previous_poll(clock):
+    scheduler = PollScheduler(POLL_INTERVAL, MAX_INTERVAL)
+    start_known_song(scheduler, clock, 'song-a')
+
+    assert next_poll_in(scheduler, clock) == SONG_MS / 1000 - POLL_INTERVAL + PollScheduler.END_MARGIN_SECONDS
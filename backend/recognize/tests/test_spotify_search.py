@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from recognizer import AsyncSpotifyClient
+
+
+def track(name, *artists):
+    return {'name': name, 'artists': [{'name': artist} for artist in artists]}
+
+
+def search(strict, combined):
+    client = AsyncSpotifyClient.__new__(AsyncSpotifyClient)
+
+    async def request(query):
+        result = strict if query.startswith('track:') else combined
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    client._search_request_async = request
+    return asyncio.run(client.search_track_async('Song', 'Band'))
+
+
+def test_strict_error_with_combined_miss_raises():
+    with pytest.raises(ConnectionError):
+        search(ConnectionError('strict failed'), None)
+
+
+def test_strict_error_with_combined_hit_uses_combined():
+    assert search(ConnectionError('strict failed'), track('Other', 'Someone')) == (track('Other', 'Someone'), 2)
+
+
+def test_both_miss_is_not_found():
+    assert search(None, None) == (None, 2)
+
+
+def test_matches_requires_whole_artist_name():
+    assert not AsyncSpotifyClient._matches(track('Song', 'A'), 'Song', 'Band A')
+    assert not AsyncSpotifyClient._matches(track('Song', ''), 'Song', '')
+    assert AsyncSpotifyClient._matches(track('Song', 'Drake'), 'Song', 'Rihanna feat. Drake')
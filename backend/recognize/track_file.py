@@ -0,0 +1,124 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterator
+
+_WHITESPACE = re.compile(r'\s*')
+_ARCHIVED_TAIL = re.compile(r'"archived"\s*:\s*true\s*\}\s*$')
+
+
+class TrackFileReader:
+    """Streams the `tracks` array of a simplified track file one entry at a time.
+
+    The file is decoded in fixed-size chunks and each track is parsed as soon as
+    it is complete, so memory stays flat regardless of file size and callers can
+    write the first tracks before the rest is read. Other top-level keys end up
+    in `fields` as they are passed. Every byte read is hashed, so `digest()`
+    gives the content hash without a second read.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    TAIL_BYTES = 256
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.fields: Dict[str, Any] = {}
+        self._file = open(path, 'rb')
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def __enter__(self) -> 'TrackFileReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @property
+    def archived(self) -> bool:
+        """Whether the file was marked archived by the old in-place rewrite (which put the key last)."""
+        if self.fields.get('archived'):
+            return True
+        size = os.fstat(self._file.fileno()).st_size
+        with open(self.path, 'rb') as file:
+            file.seek(max(0, size - self.TAIL_BYTES))
+            tail = file.read().decode('utf-8', errors='ignore')
+        return bool(_ARCHIVED_TAIL.search(tail))
+
+    def tracks(self) -> Iterator[Dict[str, Any]]:
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'tracks' and self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                return
+
+    def digest(self) -> bytes:
+        """Content hash of the whole file; reads whatever the parser has not consumed yet."""
+        while not self._eof:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                self._eof = True
+            self._hash.update(chunk)
+        return self._hash.digest()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        self._hash.update(chunk)
+        if not chunk:
+            self._eof = True
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk, final=not chunk)
+        self._pos = 0
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def _expect(self, allowed: str) -> str:
+        char = self._peek()
+        if not char or char not in allowed:
+            raise ValueError(f"Malformed track file {self.path}: expected one of {allowed!r} at offset {self._pos}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self._buffer) and self._fill():
+                continue  # a number at the end of the buffer may continue in the next chunk
+            self._pos = end
+            return value